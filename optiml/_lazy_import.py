@@ -0,0 +1,33 @@
+import sys
+from importlib.util import find_spec, module_from_spec, LazyLoader
+
+
+def lazy_import(name):
+    """
+    Import a module lazily, i.e., return a module object which is executed
+    only when one of its attributes is accessed for the first time, so that
+    heavy dependencies needed just by few code paths (e.g., the external QP
+    solvers) do not slow down the import of the whole package.
+
+    Parameters
+    ----------
+
+    name : str
+        The absolute name of the module.
+
+    Returns
+    -------
+
+    module : module
+        The (possibly not yet executed) module.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    spec.loader = LazyLoader(spec.loader)
+    module = module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -1,26 +1,36 @@
 import re
 import warnings
 from abc import ABC
+from copy import copy
 from io import StringIO
+from itertools import combinations
 
 import numpy as np
-from qpsolvers import solve_qp
-from sklearn.base import ClassifierMixin, BaseEstimator, RegressorMixin
+from joblib import Parallel, delayed
+from sklearn.base import ClassifierMixin, BaseEstimator, RegressorMixin, clone
 from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import accuracy_score, r2_score
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelBinarizer
-from wurlitzer import pipes, STDOUT
+from sklearn.utils import check_array, gen_batches, get_chunk_n_rows
+from sklearn.utils.extmath import safe_sparse_dot
 
-from .kernels import gaussian, Kernel, LinearKernel
-from .losses import (squared_hinge, squared_epsilon_insensitive,
+from .kernels import (gaussian, Kernel, LinearKernel, PrecomputedKernel, KernelApproximation, KernelCache,
+                      SignedKernelMatrix)
+from .losses import (SVMLoss, squared_hinge, squared_epsilon_insensitive,
                      Hinge, SquaredHinge, EpsilonInsensitive, SquaredEpsilonInsensitive)
 from .smo import SMO, SMOClassifier, SMORegression
 from ...opti import Optimizer
 from ...opti import Quadratic
-from ...opti.constrained import BoxConstrainedQuadraticOptimizer, AugmentedLagrangianQuadratic
+from ...opti.constrained import (BoxConstrainedQuadraticOptimizer, AugmentedLagrangianQuadratic,
+                                 SpectralProjectedGradient)
 from ...opti.unconstrained import ProximalBundle
 from ...opti.unconstrained.line_search import LineSearchOptimizer
 from ...opti.unconstrained.stochastic import StochasticOptimizer, StochasticMomentumOptimizer, StochasticGradientDescent
+from ..._lazy_import import lazy_import
+
+qpsolvers = lazy_import('qpsolvers')
+wurlitzer = lazy_import('wurlitzer')
 
 
 class SVM(BaseEstimator, ABC):
@@ -35,6 +45,25 @@ class SVM(BaseEstimator, ABC):
 
     kernel : `Kernel` instance like {linear, poly, gaussian, sigmoid}, default=gaussian
         Specifies the kernel type to be used in the algorithm.
+        When ``dual=False`` it can also be a `KernelApproximation` instance,
+        i.e., `RandomFourierFeatures` or `Nystroem`, so that the primal problem
+        is solved in the approximate feature space of the kernel, which gives
+        a non-linear decision function in O(n_samples * n_components).
+        When ``dual=True`` it can also be `precomputed`, so that X is the kernel
+        matrix wrt the training samples, see `PrecomputedKernel`.
+
+    cache_size : float, default=None
+        Specify the size of the kernel cache (in MB). If not None, the
+        columns of the kernel matrix are computed on demand and only the
+        most recently used ones are kept in memory, otherwise the full
+        kernel matrix is computed before training.
+        Only used when ``dual=True`` and ``optimizer`` is 'smo'.
+
+    shrinking : bool, default=False
+        Whether to use the shrinking heuristic, i.e., to temporarily remove
+        from the problem the variables stuck at the bounds, so that later
+        iterations only visit the free ones.
+        Only used when ``dual=True`` and ``optimizer`` is 'smo'.
 
     C : float, default=1
         Regularization parameter. The strength of the regularization is
@@ -58,7 +87,8 @@ class SVM(BaseEstimator, ABC):
         When ``fit_intercept`` is True, instance vector x becomes
         [x, intercept_scaling], i.e., a "synthetic" feature with constant
         value equals to ``intercept_scaling`` is appended to the instance vector.
-        The intercept becomes intercept_scaling * synthetic feature weight
+        The synthetic feature is handled implicitly by the loss, so X is never
+        copied. The intercept becomes intercept_scaling * synthetic feature weight.
         Note: the synthetic feature weight is subject to L1/L2 regularization
         as all other features. To lessen the effect of regularization on synthetic
         feature weight (and therefore on the intercept) ``intercept_scaling`` has
@@ -84,6 +114,9 @@ class SVM(BaseEstimator, ABC):
         e.g., the `StochasticGradientDescent` or `Adam`, which works well on relatively
         large datasets (with thousands of training samples or more) in terms of both
         training time and validation score.
+        When ``dual=True`` it can also be 'smo', i.e., the `SMOClassifier` or the
+        `SMORegression` solver, or a subclass of `SMO`, e.g., the `SecondOrderSMOClassifier`
+        which selects the working set with vectorized second order information.
 
     master_solver : string, default='ecos'
         Master solver for the proximal bundle method for the CVXPY interface.
@@ -155,6 +188,14 @@ class SVM(BaseEstimator, ABC):
         Maximum number of epochs to not meet ``tol`` improvement.
         Only used when ``optimizer`` is a subclass of `StochasticOptimizer`.
 
+    warm_start : bool, default=False
+        When set to True, reuse the solution of the previous call to fit as
+        initialization, i.e., the ``alphas_`` of the dual problem, otherwise,
+        just erase the previous solution. It is useful to refit the model with
+        slightly different hyper-parameters, e.g., ``C``, or data.
+        Only used when ``dual=True`` and ``optimizer`` is a subclass of
+        `BoxConstrainedQuadraticOptimizer`.
+
     verbose : bool or int, default=False
         Controls the verbosity of progress messages to stdout. Use a boolean value
         to switch on/off or an int value to show progress each ``verbose`` time
@@ -181,12 +222,21 @@ class SVM(BaseEstimator, ABC):
         Indices of support vectors.
 
     support_vectors_ : ndarray of shape (n_SV, n_features)
-        Support vectors.
+        Support vectors. Empty if ``kernel=precomputed``, i.e., the rows of
+        the kernel matrix of the support vectors are not copied.
+
+    kernel_ : `Kernel` or `KernelApproximation` instance
+        The kernel used in the decision function, i.e., a copy of ``kernel``
+        with gamma resolved wrt the training set and caching the squared norms
+        of the support vectors when ``dual=True`` or the fitted kernel
+        approximation when ``dual=False``.
     """
 
     def __init__(self,
                  loss=None,
                  kernel=gaussian,
+                 cache_size=None,
+                 shrinking=False,
                  C=1,
                  rho=1,
                  mu=1,
@@ -208,12 +258,19 @@ class SVM(BaseEstimator, ABC):
                  early_stopping=False,
                  validation_split=0.,
                  patience=5,
+                 warm_start=False,
                  verbose=False,
                  master_verbose=False):
         self.loss = loss
-        if not isinstance(kernel, Kernel):
+        if not isinstance(kernel, (Kernel, KernelApproximation)):
             raise TypeError(f'{kernel} is not an allowed kernel function')
         self.kernel = kernel
+        if cache_size is not None and not cache_size > 0:
+            raise ValueError('cache_size must be > 0')
+        self.cache_size = cache_size
+        if not isinstance(shrinking, bool):
+            raise ValueError('shrinking must be a boolean value')
+        self.shrinking = shrinking
         if not C > 0:
             raise ValueError('C must be > 0')
         self.C = C
@@ -232,6 +289,10 @@ class SVM(BaseEstimator, ABC):
         self.reg_intercept = reg_intercept
         if not isinstance(dual, bool):
             raise ValueError('dual must be a boolean value')
+        if dual and isinstance(kernel, KernelApproximation):
+            raise ValueError('a kernel approximation can be used only with dual=False')
+        if not dual and isinstance(kernel, PrecomputedKernel):
+            raise ValueError('a precomputed kernel can be used only with dual=True')
         self.dual = dual
         if ((self.dual and not (isinstance(optimizer, str) or
                                 not issubclass(optimizer, SMO) or
@@ -254,6 +315,9 @@ class SVM(BaseEstimator, ABC):
         self.early_stopping = early_stopping
         self.validation_split = validation_split
         self.patience = patience
+        if not isinstance(warm_start, bool):
+            raise ValueError('warm_start must be a boolean value')
+        self.warm_start = warm_start
         self.verbose = verbose
         self.master_verbose = master_verbose
         if (not self.dual or
@@ -265,7 +329,147 @@ class SVM(BaseEstimator, ABC):
         if self.dual:
             self.alphas_ = np.zeros(0)
             self.dual_coef_ = np.zeros(0)
-        if not isinstance(optimizer, str):
+        self._reset()
+
+    def fit(self, X, y):
+        raise NotImplementedError
+
+    def fit_path(self, X, y, Cs):
+        """
+        Fit the model over a grid of values of the regularization parameter C.
+
+        The kernel matrix (when ``dual=True``) or the mapping of X in the feature
+        space of the kernel approximation (when ``dual=False``) is computed just
+        once, then the values of C are solved in increasing order, each one warm
+        started from the solution of the previous one, i.e., ``alphas_`` or
+        ``coef_`` and ``intercept_``.
+
+        Parameters
+        ----------
+
+        X : array-like of shape (n_samples, n_features)
+
+        y : array-like of shape (n_samples,)
+
+        Cs : array-like of shape (n_Cs,)
+            The values of the regularization parameter C, each one must be > 0.
+
+        Returns
+        -------
+
+        models : list of length n_Cs
+            The models fitted for each value in ``Cs``, in the same order. The
+            estimator itself is left fitted with the largest value of C.
+        """
+        Cs = np.asarray(Cs, dtype=float)
+        if Cs.ndim != 1 or not Cs.size:
+            raise ValueError('Cs must be a non-empty 1D array')
+        if not np.all(Cs > 0):
+            raise ValueError('C must be > 0')
+        warm_start = self.warm_start
+        self.warm_start = True
+        try:
+            if self.dual:
+                self._gram = self._kernel_matrix(X)
+            else:
+                self._mapped_X = self._fit_kernel_approximation(X)
+            models = [None] * Cs.size
+            for i in np.argsort(Cs, kind='stable'):
+                self.C = Cs[i]
+                model = self.fit(X, y)._light_copy()
+                model.warm_start = warm_start
+                models[i] = model
+        finally:
+            self.warm_start = warm_start
+            self._gram = self._mapped_X = None
+        return models
+
+    def decision_function(self, X, batch_size=None, n_jobs=None):
+        """
+        Evaluate the decision function for the samples in X.
+
+        Parameters
+        ----------
+
+        X : array-like of shape (n_samples, n_features)
+
+        batch_size : int, default=None
+            Number of samples for which the kernel wrt the support vectors is
+            computed at once, to bound the memory footprint. If None, it is
+            chosen such that a batch fits in the sklearn ``working_memory``.
+            Only used when ``dual=True`` and the kernel is not linear.
+
+        n_jobs : int, default=None
+            Number of threads used to evaluate the batches. ``None`` means 1
+            unless in a `joblib.parallel_backend` context, -1 means using all
+            the processors. Only used when ``dual=True`` and the kernel is not
+            linear.
+        """
+        if self.dual and not isinstance(self.kernel, LinearKernel):
+            X = check_array(X, accept_sparse='csr')
+            if batch_size is None:
+                batch_size = get_chunk_n_rows(row_bytes=8 * len(self.support_), max_n_rows=X.shape[0])
+            elif not batch_size > 0:
+                raise ValueError('batch_size must be > 0')
+            decision = np.empty(X.shape[0])
+            batches = gen_batches(X.shape[0], batch_size)
+            if n_jobs in (None, 1) or batch_size >= X.shape[0]:
+                for rows in batches:
+                    self._batch_decision_function(X, rows, decision)
+            else:
+                Parallel(n_jobs=n_jobs, prefer='threads')(
+                    delayed(self._batch_decision_function)(X, rows, decision) for rows in batches)
+            return decision
+        if isinstance(self.kernel, KernelApproximation):
+            X = self.kernel_.transform(X)
+        return self._decision_function(X)
+
+    def _decision_function(self, X):
+        # the decision function of the primal model wrt
+        # the instance vectors in its own feature space
+        return safe_sparse_dot(X, self.coef_) + self.intercept_
+
+    def _fit_kernel_approximation(self, X):
+        # map the instance vectors in the approximate feature
+        # space of the kernel, if any, to solve the primal problem
+        if getattr(self, '_mapped_X', None) is not None:
+            # already mapped once by fit_path for all the values of C
+            return self._mapped_X
+        if isinstance(self.kernel, KernelApproximation):
+            self.kernel_ = clone(self.kernel).fit(X)
+            return self.kernel_.transform(X)
+        return X
+
+    def _batch_decision_function(self, X, rows, out):
+        out[rows] = np.dot(self.kernel_(X[rows], self._kernel_support()), self.dual_coef_) + self.intercept_
+
+    def _kernel_support(self):
+        # the kernel of the decision function is evaluated wrt the support vectors
+        # or, when it is precomputed, wrt their indices, i.e., its columns
+        if isinstance(self.kernel, PrecomputedKernel):
+            return self.support_
+        return self.support_vectors_
+
+    def _dual_support_vectors(self, X):
+        # the rows of a precomputed kernel matrix of the support vectors are never used
+        # in the decision function, so they are not copied, e.g., from a np.memmap
+        if isinstance(self.kernel, PrecomputedKernel):
+            return np.zeros((0, 0))
+        return X[self.support_]
+
+    def _is_smo(self):
+        return (self.optimizer == 'smo' or
+                (isinstance(self.optimizer, type) and issubclass(self.optimizer, SMO)))
+
+    def _reset(self):
+        # the loss and the optimizer of the previous call to fit, if any, have
+        # been replaced by their instances, so recover their classes to be able
+        # to fit again, and clear the training histories
+        if isinstance(self.loss, SVMLoss):
+            self.loss = type(self.loss)
+        if not isinstance(self.optimizer, (str, type)):
+            self.optimizer = type(self.optimizer)
+        if not isinstance(self.optimizer, str):
             self.train_loss_history = []
         if not self.dual and issubclass(self.optimizer, StochasticOptimizer):
             self.train_score_history = []
@@ -277,14 +481,68 @@ class SVM(BaseEstimator, ABC):
                 self.best_val_score = -np.inf
             else:
                 self.best_loss = np.inf
-
-    def fit(self, X, y):
-        raise NotImplementedError
-
-    def decision_function(self, X):
-        if self.dual and not isinstance(self.kernel, LinearKernel):
-            return np.dot(self.dual_coef_, self.kernel(self.support_vectors_, X)) + self.intercept_
-        return np.dot(X, self.coef_) + self.intercept_
+        if self.dual:
+            self.intercept_ = 0.
+
+    def _light_copy(self):
+        # a shallow copy of the fitted model where the loss and the optimizer
+        # are replaced by their classes, as if the model were never fitted, to
+        # drop the references to the training data, e.g., the kernel matrix
+        model = copy(self)
+        if isinstance(model.loss, SVMLoss):
+            model.loss = type(model.loss)
+        if not isinstance(model.optimizer, (str, type)):
+            model.optimizer = type(model.optimizer)
+        model._gram = model._mapped_X = None
+        return model
+
+    def _warm_start_alphas(self, n_alphas):
+        # the solution of the previous call to fit, if any, to start the dual
+        # optimizer from when the number of dual variables has not changed
+        if self.warm_start and self.alphas_.size == n_alphas:
+            return self.alphas_
+        return None
+
+    def _warm_start_coef(self, n_coef):
+        # the solution of the previous call to fit, if any, to start the primal
+        # optimizer from when the number of (packed) coefficients has not changed
+        if self.warm_start and self.coef_.size + self.fit_intercept == n_coef:
+            return self._pack(self.coef_, self.intercept_)
+        return None
+
+    def _dual_intercept(self, Q, q, A, ub):
+        if self.reg_intercept:
+            # the regularized bias is implicit in the dual, i.e., Q += A A^T,
+            # and it is given by the same expansion of the coefficients
+            return A.dot(self.alphas_)
+        # the bias from the KKT conditions of the dual, i.e., (Q alphas + q)_i = -b A_i
+        # for each free variable 0 < alphas_i < ub, where A^T alphas = 0 is the
+        # equality constraint, averaged over all of them as in libsvm, or over
+        # all the support vectors if there are no free ones
+        sv = self.alphas_ > 1e-6
+        free = np.logical_and(sv, self.alphas_ < ub - 1e-6)
+        if not free.any():
+            free = sv
+        # the KKT gradient wrt the free variables, i.e., just a
+        # matvec over the submatrix of Q of the support vectors
+        g = Q[np.ix_(free, sv)].dot(self.alphas_[sv]) + q[free]
+        return -np.mean(A[free] * g) if free.any() else 0.
+
+    def _is_kernel_cached(self):
+        # a precomputed kernel matrix is X itself, so there is nothing to cache
+        return (self.cache_size is not None and self._is_smo() and
+                not isinstance(self.kernel, PrecomputedKernel))
+
+    def _kernel_matrix(self, X):
+        # the kernel matrix computed once by fit_path for all the values of C
+        if getattr(self, '_gram', None) is not None:
+            return self._gram
+        # the SMO solvers just need few kernel columns at each
+        # step, so they can work on top of a bounded kernel cache
+        if self._is_kernel_cached():
+            return KernelCache(self.kernel, X, self.cache_size)
+        # compute the kernel matrix by row tiles to bound the temporaries
+        return self.kernel.gram(X)
 
     def _store_train_info(self, opt):
         if opt.is_lagrangian_dual():
@@ -292,9 +550,16 @@ class SVM(BaseEstimator, ABC):
         else:
             self.train_loss_history.append(opt.f_x)
 
+    def _pack(self, coef, intercept):
+        if self.fit_intercept:
+            return np.append(coef, intercept / self.intercept_scaling)
+        # a copy, since the optimizers update their x in place and
+        # it must not alias the coef_ of a previously fitted model
+        return np.array(coef, dtype=float)
+
     def _unpack(self, packed_coef_inter):
         if self.fit_intercept:
-            self.coef_, self.intercept_ = packed_coef_inter[:-1], packed_coef_inter[-1]
+            self.coef_, self.intercept_ = packed_coef_inter[:-1], self.intercept_scaling * packed_coef_inter[-1]
         else:
             self.coef_ = packed_coef_inter
 
@@ -325,6 +590,7 @@ class SVM(BaseEstimator, ABC):
                 if self.val_score_history[-1] > self.best_val_score:
                     self.best_val_score = self.val_score_history[-1]
                     self._best_coef = self.coef_.copy()
+                    self._best_intercept = self.intercept_
 
             else:  # monitor train_loss
 
@@ -338,7 +604,8 @@ class SVM(BaseEstimator, ABC):
             if self._no_improvement_count >= self.patience:
 
                 if self.validation_split:
-                    opt.x = self._best_coef
+                    opt.x = self._pack(self._best_coef, self._best_intercept)
+                    self._unpack(opt.x)
 
                 if self.verbose:
                     if self.validation_split:
@@ -361,11 +628,33 @@ class SVC(ClassifierMixin, SVM):
     loss : `SVMLoss` instance like {hinge, squared_hinge}, default='squared_hinge'
         Specifies the loss function. The hinge loss is the L1 loss, while the
         squared hinge loss is the L2 loss.
+
+    multi_class : {'ovr', 'ovo'}, default='ovr'
+        The strategy to train a model over more than two labels, i.e., a binary
+        model for each label against all the others ('ovr') or for each pair of
+        labels ('ovo'). When ``dual=True`` the kernel matrix is computed just
+        once and each binary model is fitted on its own slice of it.
+
+    n_jobs : int, default=None
+        Number of processes used to fit the binary models when there are more
+        than two labels. ``None`` means 1 unless in a `joblib.parallel_backend`
+        context, -1 means using all the processors. The kernel matrix is shared
+        among the processes by memory mapping.
+
+    Attributes
+    ----------
+
+    estimators_ : list of `SVC` instances
+        The binary models fitted when there are more than two labels, i.e.,
+        one for each label with ``multi_class='ovr'`` or one for each pair of
+        labels, sorted lexicographically, with ``multi_class='ovo'``.
     """
 
     def __init__(self,
                  loss=squared_hinge,
                  kernel=gaussian,
+                 cache_size=None,
+                 shrinking=False,
                  C=1,
                  rho=1,
                  mu=1,
@@ -387,10 +676,15 @@ class SVC(ClassifierMixin, SVM):
                  early_stopping=False,
                  validation_split=0.,
                  patience=5,
+                 warm_start=False,
+                 multi_class='ovr',
+                 n_jobs=None,
                  verbose=False,
                  master_verbose=False):
         super(SVC, self).__init__(loss=loss,
                                   kernel=kernel,
+                                  cache_size=cache_size,
+                                  shrinking=shrinking,
                                   C=C,
                                   rho=rho,
                                   mu=mu,
@@ -412,21 +706,26 @@ class SVC(ClassifierMixin, SVM):
                                   early_stopping=early_stopping,
                                   validation_split=validation_split,
                                   patience=patience,
+                                  warm_start=warm_start,
                                   verbose=verbose,
                                   master_verbose=master_verbose)
         if not loss._loss_type == 'classifier':
             raise TypeError(f'{loss} is not an allowed SVC loss function')
+        if multi_class not in ('ovr', 'ovo'):
+            raise ValueError(f'unknown multi_class strategy {multi_class}')
+        self.multi_class = multi_class
+        self.n_jobs = n_jobs
         self.lb = LabelBinarizer(neg_label=-1)
 
     def _store_train_val_info(self, opt, X_batch, y_batch, X_val, y_val):
         super(SVC, self)._store_train_val_info(opt, X_batch, y_batch, X_val, y_val)
         if opt.is_batch_end():
-            acc = self.score(X_batch[:, :-1] if self.fit_intercept else X_batch, y_batch)
+            acc = self._score(X_batch, y_batch)
             self.train_score_history.append(acc)
             if opt.is_verbose():
                 print('\tacc: {:1.4f}'.format(acc), end='')
             if self.validation_split:
-                val_acc = self.score(X_val[:, :-1] if self.fit_intercept else X_val, y_val)
+                val_acc = self._score(X_val, y_val)
                 self.val_score_history.append(val_acc)
                 if opt.is_verbose():
                     print('\tval_acc: {:1.4f}'.format(val_acc), end='')
@@ -434,22 +733,26 @@ class SVC(ClassifierMixin, SVM):
 
     def fit(self, X, y):
         self.lb.fit(y)
+
+        self._reset()
+
         if len(self.lb.classes_) > 2:
-            raise ValueError('use OneVsOneClassifier or OneVsRestClassifier from sklearn.multiclass '
-                             'to train a model over more than two labels')
+            return self._fit_multiclass(X, y)
+
         y = self.lb.transform(y).ravel()
 
         if not self.dual:
 
-            if issubclass(self.optimizer, LineSearchOptimizer):
+            # the support vectors are the input samples, i.e., not
+            # their mapping in the feature space of the kernel, if any
+            samples, rows = X, np.arange(X.shape[0])
+            X = self._fit_kernel_approximation(X)
 
-                if self.fit_intercept:
-                    X_biased = np.c_[X, np.full_like(y, self.intercept_scaling)]
-                else:
-                    X_biased = X
+            if issubclass(self.optimizer, LineSearchOptimizer):
 
-                self.loss = self.loss(self, X_biased, y)
+                self.loss = self.loss(self, X, y)
                 self.optimizer = self.optimizer(f=self.loss,
+                                                x=self._warm_start_coef(self.loss.ndim),
                                                 max_iter=self.max_iter,
                                                 max_f_eval=self.max_f_eval,
                                                 random_state=self.random_state,
@@ -467,13 +770,9 @@ class SVC(ClassifierMixin, SVM):
 
             elif issubclass(self.optimizer, ProximalBundle):
 
-                if self.fit_intercept:
-                    X_biased = np.c_[X, np.full_like(y, self.intercept_scaling)]
-                else:
-                    X_biased = X
-
-                self.loss = self.loss(self, X_biased, y)
+                self.loss = self.loss(self, X, y)
                 self.optimizer = self.optimizer(f=self.loss,
+                                                x=self._warm_start_coef(self.loss.ndim),
                                                 mu=self.mu,
                                                 max_iter=self.max_iter,
                                                 master_solver=self.master_solver,
@@ -490,29 +789,19 @@ class SVC(ClassifierMixin, SVM):
             elif issubclass(self.optimizer, StochasticOptimizer):
 
                 if self.validation_split:
-                    X, X_val, y, y_val = train_test_split(X, y,
-                                                          test_size=self.validation_split,
-                                                          random_state=self.random_state)
-
-                    if self.fit_intercept:
-                        X_val_biased = np.c_[X_val, np.full_like(y_val, self.intercept_scaling)]
-                    else:
-                        X_val_biased = X_val
-
+                    X, X_val, y, y_val, rows, _ = train_test_split(X, y, rows,
+                                                                   test_size=self.validation_split,
+                                                                   random_state=self.random_state)
                 else:
-                    X_val_biased = None
+                    X_val = None
                     y_val = None
 
-                if self.fit_intercept:
-                    X_biased = np.c_[X, np.full_like(y, self.intercept_scaling)]
-                else:
-                    X_biased = X
-
-                self.loss = self.loss(self, X_biased, y)
+                self.loss = self.loss(self, X, y)
 
                 if issubclass(self.optimizer, StochasticMomentumOptimizer):
 
                     self.optimizer = self.optimizer(f=self.loss,
+                                                    x=self._warm_start_coef(self.loss.ndim),
                                                     epochs=self.max_iter,
                                                     step_size=(self.loss.step_size if self.learning_rate == 'auto'
                                                                else self.learning_rate),
@@ -520,19 +809,20 @@ class SVC(ClassifierMixin, SVM):
                                                     momentum=self.momentum,
                                                     batch_size=self.batch_size,
                                                     callback=self._store_train_val_info,
-                                                    callback_args=(X_val_biased, y_val),
+                                                    callback_args=(X_val, y_val),
                                                     shuffle=self.shuffle,
                                                     random_state=self.random_state,
                                                     verbose=self.verbose).minimize()
                 else:
 
                     self.optimizer = self.optimizer(f=self.loss,
+                                                    x=self._warm_start_coef(self.loss.ndim),
                                                     epochs=self.max_iter,
                                                     step_size=(self.loss.step_size if self.learning_rate == 'auto'
                                                                else self.learning_rate),
                                                     batch_size=self.batch_size,
                                                     callback=self._store_train_val_info,
-                                                    callback_args=(X_val_biased, y_val),
+                                                    callback_args=(X_val, y_val),
                                                     shuffle=self.shuffle,
                                                     random_state=self.random_state,
                                                     verbose=self.verbose).minimize()
@@ -541,31 +831,40 @@ class SVC(ClassifierMixin, SVM):
 
                 raise TypeError(f'{self.optimizer} is not an allowed optimizer')
 
-            self.support_ = np.argwhere(np.abs(self.decision_function(X)) <= 1).ravel()
-            self.support_vectors_ = X[self.support_]
+            self.support_ = rows[np.abs(self._decision_function(X)) <= 1]
+            self.support_vectors_ = samples[self.support_]
 
         else:
 
             n_samples = len(y)
 
             # kernel matrix
-            K = self.kernel(X)
-
-            Q = K * np.outer(y, y)
+            K = self._kernel_matrix(X)
+
+            # the Hessian K * y y^T is never formed explicitly, i.e., it is applied
+            # through K, as well as the regularized intercept y y^T and the diagonal
+            # of the squared hinge, so the memory footprint is just the one of K
+            Q = (SignedKernelMatrix(K, y,
+                                    intercept=1. if self.reg_intercept else 0.,
+                                    diagonal=1 / (2 * self.C) if self.loss == SquaredHinge else 0.)
+                 if not isinstance(K, KernelCache) else None)
             q = -np.ones(n_samples)
 
             if self.loss == Hinge:
 
                 ub = np.ones(n_samples) * self.C  # upper bounds
 
-                if self.optimizer == 'smo' or self.optimizer == SMO:
+                if self._is_smo():
 
                     if not self.reg_intercept:
 
-                        self.obj = Quadratic(Q, q)
+                        self.obj = Quadratic(Q, q) if Q is not None else None
 
-                        self.optimizer = SMOClassifier(self.obj, X, y, K, self.kernel, self.C,
-                                                       self.tol, self.verbose).minimize()
+                        smo = SMOClassifier if self.optimizer in ('smo', SMO) else self.optimizer
+                        if issubclass(smo, SMORegression):
+                            raise TypeError(f'{smo} is not an allowed SVC optimizer')
+                        self.optimizer = smo(self.obj, X, y, K, self.kernel, self.C, self.tol,
+                                             self.verbose, self.shrinking).minimize()
                         self.alphas_ = self.optimizer.alphas
                         if isinstance(self.kernel, LinearKernel):
                             self.coef_ = self.optimizer.w
@@ -584,29 +883,28 @@ class SVC(ClassifierMixin, SVM):
                         self.obj = Quadratic(Q, q)
 
                         out = StringIO()
-                        with pipes(stdout=out, stderr=STDOUT):
-                            self.alphas_ = solve_qp(P=Q,
-                                                    q=q,
-                                                    A=y.astype(float),
-                                                    b=np.zeros(1),
-                                                    lb=lb,
-                                                    ub=ub,
-                                                    solver=self.optimizer,
-                                                    verbose=False if self.verbose < 0 else True)  # trick for Jupyter
+                        with wurlitzer.pipes(stdout=out, stderr=wurlitzer.STDOUT):
+                            self.alphas_ = qpsolvers.solve_qp(P=np.array(Q),
+                                                              q=q,
+                                                              A=y.astype(float),
+                                                              b=np.zeros(1),
+                                                              lb=lb,
+                                                              ub=ub,
+                                                              solver=self.optimizer,
+                                                              verbose=False if self.verbose < 0 else True)  # trick for Jupyter
 
                     else:
 
-                        Q += np.outer(y, y)
                         self.obj = Quadratic(Q, q)
 
                         out = StringIO()
-                        with pipes(stdout=out, stderr=STDOUT):
-                            self.alphas_ = solve_qp(P=Q,
-                                                    q=q,
-                                                    lb=lb,
-                                                    ub=ub,
-                                                    solver=self.optimizer,
-                                                    verbose=False if self.verbose < 0 else True)  # trick for Jupyter
+                        with wurlitzer.pipes(stdout=out, stderr=wurlitzer.STDOUT):
+                            self.alphas_ = qpsolvers.solve_qp(P=np.array(Q),
+                                                              q=q,
+                                                              lb=lb,
+                                                              ub=ub,
+                                                              solver=self.optimizer,
+                                                              verbose=False if self.verbose < 0 else True)  # trick for Jupyter
 
                     stdout = out.getvalue()
                     if stdout:
@@ -618,18 +916,25 @@ class SVC(ClassifierMixin, SVM):
 
                     if issubclass(self.optimizer, BoxConstrainedQuadraticOptimizer):
 
+                        eq_constraint = {}
+
                         if not self.reg_intercept:
 
-                            # TODO constrained optimizer with A x = 0 and 0 <= x <= ub is not available
-                            raise NotImplementedError
+                            # only the SpectralProjectedGradient handles the A x = 0 constraint
+                            if not issubclass(self.optimizer, SpectralProjectedGradient):
+                                raise NotImplementedError
+
+                            self.obj = Quadratic(Q, q)
+                            eq_constraint = {'A': y, 'b': 0.}
 
                         else:
 
-                            Q += np.outer(y, y)
                             self.obj = Quadratic(Q, q)
 
                         self.optimizer = self.optimizer(quad=self.obj,
                                                         ub=ub,
+                                                        x=self._warm_start_alphas(ub.size),
+                                                        **eq_constraint,
                                                         tol=self.tol,
                                                         max_iter=self.max_iter,
                                                         callback=self._store_train_info,
@@ -650,7 +955,6 @@ class SVC(ClassifierMixin, SVM):
 
                         else:
 
-                            Q += np.outer(y, y)
                             self.obj = AugmentedLagrangianQuadratic(primal=Quadratic(Q, q),
                                                                     lb=lb,
                                                                     ub=ub,
@@ -726,9 +1030,6 @@ class SVC(ClassifierMixin, SVM):
 
             elif self.loss == SquaredHinge:
 
-                D = np.diag(np.ones(n_samples) / (2 * self.C))
-                Q += D
-
                 if isinstance(self.optimizer, str):
 
                     lb = np.zeros(n_samples)  # lower bounds
@@ -738,27 +1039,26 @@ class SVC(ClassifierMixin, SVM):
                         self.obj = Quadratic(Q, q)
 
                         out = StringIO()
-                        with pipes(stdout=out, stderr=STDOUT):
-                            self.alphas_ = solve_qp(P=Q,
-                                                    q=q,
-                                                    A=y.astype(float),
-                                                    b=np.zeros(1),
-                                                    lb=lb,
-                                                    solver=self.optimizer,
-                                                    verbose=False if self.verbose < 0 else True)  # trick for Jupyter
+                        with wurlitzer.pipes(stdout=out, stderr=wurlitzer.STDOUT):
+                            self.alphas_ = qpsolvers.solve_qp(P=np.array(Q),
+                                                              q=q,
+                                                              A=y.astype(float),
+                                                              b=np.zeros(1),
+                                                              lb=lb,
+                                                              solver=self.optimizer,
+                                                              verbose=False if self.verbose < 0 else True)  # trick for Jupyter
 
                     else:
 
-                        Q += np.outer(y, y)
                         self.obj = Quadratic(Q, q)
 
                         out = StringIO()
-                        with pipes(stdout=out, stderr=STDOUT):
-                            self.alphas_ = solve_qp(P=Q,
-                                                    q=q,
-                                                    lb=lb,
-                                                    solver=self.optimizer,
-                                                    verbose=False if self.verbose < 0 else True)  # trick for Jupyter
+                        with wurlitzer.pipes(stdout=out, stderr=wurlitzer.STDOUT):
+                            self.alphas_ = qpsolvers.solve_qp(P=np.array(Q),
+                                                              q=q,
+                                                              lb=lb,
+                                                              solver=self.optimizer,
+                                                              verbose=False if self.verbose < 0 else True)  # trick for Jupyter
 
                     stdout = out.getvalue()
                     if stdout:
@@ -770,8 +1070,31 @@ class SVC(ClassifierMixin, SVM):
 
                     if issubclass(self.optimizer, BoxConstrainedQuadraticOptimizer):
 
-                        # TODO bcqp optimizer with 0 <= x <= +inf, i.e., without upper bound, is not available
-                        raise NotImplementedError
+                        ub = np.full(n_samples, np.inf)  # no upper bounds
+
+                        eq_constraint = {}
+
+                        if not self.reg_intercept:
+
+                            # only the SpectralProjectedGradient handles the A x = 0 constraint
+                            if not issubclass(self.optimizer, SpectralProjectedGradient):
+                                raise NotImplementedError
+
+                            self.obj = Quadratic(Q, q)
+                            eq_constraint = {'A': y, 'b': 0.}
+
+                        else:
+
+                            self.obj = Quadratic(Q, q)
+
+                        self.optimizer = self.optimizer(quad=self.obj,
+                                                        ub=ub,
+                                                        x=self._warm_start_alphas(ub.size),
+                                                        **eq_constraint,
+                                                        tol=self.tol,
+                                                        max_iter=self.max_iter,
+                                                        callback=self._store_train_info,
+                                                        verbose=self.verbose).minimize()
 
                     elif issubclass(self.optimizer, Optimizer):
 
@@ -787,7 +1110,6 @@ class SVC(ClassifierMixin, SVM):
 
                         else:
 
-                            Q += np.outer(y, y)
                             self.obj = AugmentedLagrangianQuadratic(primal=Quadratic(Q, q),
                                                                     lb=lb,
                                                                     rho=self.rho)
@@ -866,23 +1188,92 @@ class SVC(ClassifierMixin, SVM):
 
             sv = self.alphas_ > 1e-6
             self.support_ = np.arange(len(self.alphas_))[sv]
-            self.support_vectors_, sv_y, alphas = X[sv], y[sv], self.alphas_[sv]
+            self.support_vectors_ = self._dual_support_vectors(X)
+            sv_y, alphas = y[sv], self.alphas_[sv]
             self.dual_coef_ = alphas * sv_y
+            self.kernel_ = self.kernel.bind(X, self._kernel_support())
 
-            if self.optimizer != SMOClassifier:
+            # the SMO solvers already hold the bias from their own KKT gradient
+            if not isinstance(self.optimizer, SMO):
 
                 if isinstance(self.kernel, LinearKernel):
                     self.coef_ = np.dot(self.dual_coef_, self.support_vectors_)
 
-                for n in range(len(alphas)):
-                    self.intercept_ += sv_y[n]
-                    self.intercept_ -= np.sum(self.dual_coef_ * K[self.support_[n], sv])
-                self.intercept_ /= len(alphas)
+                self.intercept_ = self._dual_intercept(Q, q, y, self.C if self.loss == Hinge else np.inf)
 
         return self
 
-    def predict(self, X):
-        return self.lb.inverse_transform(self.decision_function(X))
+    def _fit_multiclass(self, X, y):
+        y = np.asarray(y)
+        if self.multi_class == 'ovr':
+            subproblems = [(None, (y == label).astype(int)) for label in self.lb.classes_]
+        else:
+            subproblems = []
+            for i, j in combinations(self.lb.classes_, 2):
+                idx = np.flatnonzero((y == i) | (y == j))
+                subproblems.append((idx, (y[idx] == j).astype(int)))
+        # the kernel matrix is computed once and sliced for each binary
+        # model, unless the SMO solvers work on top of a bounded kernel cache
+        # or it is precomputed, i.e., X itself, so the kernel of the binary
+        # models is bound to the whole X, i.e., gamma is resolved wrt all the
+        # samples, as for the shared matrix
+        K = None
+        kernel = self.kernel
+        if self.dual and not (self._is_kernel_cached() or isinstance(self.kernel, PrecomputedKernel)):
+            K = self._kernel_matrix(X)
+            kernel = self.kernel.bind(X)
+        self.estimators_ = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_binary)(clone(self).set_params(kernel=kernel), X, y_binary, idx, K)
+            for idx, y_binary in subproblems)
+        return self
+
+    def decision_function(self, X, batch_size=None, n_jobs=None):
+        if len(self.lb.classes_) > 2:
+            decisions = np.column_stack([estimator.decision_function(X, batch_size, n_jobs)
+                                         for estimator in self.estimators_])
+            if self.multi_class == 'ovr':
+                return decisions
+            # the votes of the pairwise models, where the ties are broken by
+            # their (monotonically transformed, so bounded in (-1/3, 1/3)) sum
+            # of the confidences, as in sklearn.multiclass.OneVsOneClassifier
+            votes = np.zeros((decisions.shape[0], len(self.lb.classes_)))
+            confidences = np.zeros_like(votes)
+            for k, (i, j) in enumerate(combinations(range(len(self.lb.classes_)), 2)):
+                votes[:, j] += decisions[:, k] > 0
+                votes[:, i] += decisions[:, k] <= 0
+                confidences[:, j] += decisions[:, k]
+                confidences[:, i] -= decisions[:, k]
+            return votes + confidences / (3 * (np.abs(confidences) + 1))
+        return super(SVC, self).decision_function(X, batch_size, n_jobs)
+
+    def predict(self, X, batch_size=None, n_jobs=None):
+        return self.lb.inverse_transform(self.decision_function(X, batch_size, n_jobs))
+
+    def _score(self, X, y):
+        # the accuracy wrt the instance vectors in the feature space of the primal model
+        return accuracy_score(y, self.lb.inverse_transform(self._decision_function(X)))
+
+
+def _fit_binary(estimator, X, y, idx, K):
+    # fit a binary model of the multiclass SVC over the samples in idx, if
+    # any, on top of the slice of the shared kernel matrix K, if any
+    precomputed = isinstance(estimator.kernel, PrecomputedKernel)
+    n_samples = X.shape[0]
+    if idx is not None:
+        # the columns of a precomputed kernel also index the training samples
+        X = X[np.ix_(idx, idx)] if precomputed else X[idx]
+    if K is not None:
+        estimator._gram = K if idx is None else K[np.ix_(idx, idx)]
+    try:
+        estimator.fit(X, y)
+    finally:
+        estimator._gram = None
+    if precomputed and idx is not None:
+        # so that the binary model is evaluated on the columns of its
+        # support vectors within the kernel wrt all the training samples
+        estimator.support_ = idx[estimator.support_]
+        estimator.kernel_._n_samples = n_samples
+    return estimator._light_copy()
 
 
 class SVR(RegressorMixin, SVM):
@@ -908,6 +1299,8 @@ class SVR(RegressorMixin, SVM):
                  loss=squared_epsilon_insensitive,
                  epsilon=0.1,
                  kernel=gaussian,
+                 cache_size=None,
+                 shrinking=False,
                  C=1,
                  rho=1,
                  mu=1,
@@ -929,10 +1322,13 @@ class SVR(RegressorMixin, SVM):
                  early_stopping=False,
                  validation_split=0.,
                  patience=5,
+                 warm_start=False,
                  verbose=False,
                  master_verbose=False):
         super(SVR, self).__init__(loss=loss,
                                   kernel=kernel,
+                                  cache_size=cache_size,
+                                  shrinking=shrinking,
                                   C=C,
                                   rho=rho,
                                   mu=mu,
@@ -954,6 +1350,7 @@ class SVR(RegressorMixin, SVM):
                                   early_stopping=early_stopping,
                                   validation_split=validation_split,
                                   patience=patience,
+                                  warm_start=warm_start,
                                   verbose=verbose,
                                   master_verbose=master_verbose)
         if not loss._loss_type == 'regressor':
@@ -965,12 +1362,12 @@ class SVR(RegressorMixin, SVM):
     def _store_train_val_info(self, opt, X_batch, y_batch, X_val, y_val):
         super(SVR, self)._store_train_val_info(opt, X_batch, y_batch, X_val, y_val)
         if opt.is_batch_end():
-            r2 = self.score(X_batch[:, :-1] if self.fit_intercept else X_batch, y_batch)
+            r2 = self._score(X_batch, y_batch)
             self.train_score_history.append(r2)
             if opt.is_verbose():
                 print('\tr2: {: 1.4f}'.format(r2), end='')
             if self.validation_split:
-                val_r2 = self.score(X_val[:, :-1] if self.fit_intercept else X_val, y_val)
+                val_r2 = self._score(X_val, y_val)
                 self.val_score_history.append(val_r2)
                 if opt.is_verbose():
                     print('\tval_r2: {: 1.4f}'.format(val_r2), end='')
@@ -982,17 +1379,20 @@ class SVR(RegressorMixin, SVM):
             raise ValueError('use sklearn.multioutput.MultiOutputRegressor '
                              'to train a model over more than one target')
 
+        self._reset()
+
         if not self.dual:
 
-            if issubclass(self.optimizer, LineSearchOptimizer):
+            # the support vectors are the input samples, i.e., not
+            # their mapping in the feature space of the kernel, if any
+            samples, rows = X, np.arange(X.shape[0])
+            X = self._fit_kernel_approximation(X)
 
-                if self.fit_intercept:
-                    X_biased = np.c_[X, np.full_like(y, self.intercept_scaling)]
-                else:
-                    X_biased = X
+            if issubclass(self.optimizer, LineSearchOptimizer):
 
-                self.loss = self.loss(self, X_biased, y, self.epsilon)
+                self.loss = self.loss(self, X, y, self.epsilon)
                 self.optimizer = self.optimizer(f=self.loss,
+                                                x=self._warm_start_coef(self.loss.ndim),
                                                 max_iter=self.max_iter,
                                                 max_f_eval=self.max_f_eval,
                                                 random_state=self.random_state,
@@ -1010,13 +1410,9 @@ class SVR(RegressorMixin, SVM):
 
             elif issubclass(self.optimizer, ProximalBundle):
 
-                if self.fit_intercept:
-                    X_biased = np.c_[X, np.full_like(y, self.intercept_scaling)]
-                else:
-                    X_biased = X
-
-                self.loss = self.loss(self, X_biased, y, self.epsilon)
+                self.loss = self.loss(self, X, y, self.epsilon)
                 self.optimizer = self.optimizer(f=self.loss,
+                                                x=self._warm_start_coef(self.loss.ndim),
                                                 mu=self.mu,
                                                 max_iter=self.max_iter,
                                                 master_solver=self.master_solver,
@@ -1033,29 +1429,19 @@ class SVR(RegressorMixin, SVM):
             elif issubclass(self.optimizer, StochasticOptimizer):
 
                 if self.validation_split:
-                    X, X_val, y, y_val = train_test_split(X, y,
-                                                          test_size=self.validation_split,
-                                                          random_state=self.random_state)
-
-                    if self.fit_intercept:
-                        X_val_biased = np.c_[X_val, np.full_like(y_val, self.intercept_scaling)]
-                    else:
-                        X_val_biased = X_val
-
+                    X, X_val, y, y_val, rows, _ = train_test_split(X, y, rows,
+                                                                   test_size=self.validation_split,
+                                                                   random_state=self.random_state)
                 else:
-                    X_val_biased = None
+                    X_val = None
                     y_val = None
 
-                if self.fit_intercept:
-                    X_biased = np.c_[X, np.full_like(y, self.intercept_scaling)]
-                else:
-                    X_biased = X
-
-                self.loss = self.loss(self, X_biased, y, self.epsilon)
+                self.loss = self.loss(self, X, y, self.epsilon)
 
                 if issubclass(self.optimizer, StochasticMomentumOptimizer):
 
                     self.optimizer = self.optimizer(f=self.loss,
+                                                    x=self._warm_start_coef(self.loss.ndim),
                                                     epochs=self.max_iter,
                                                     step_size=(self.loss.step_size if self.learning_rate == 'auto'
                                                                else self.learning_rate),
@@ -1063,7 +1449,7 @@ class SVR(RegressorMixin, SVM):
                                                     momentum=self.momentum,
                                                     batch_size=self.batch_size,
                                                     callback=self._store_train_val_info,
-                                                    callback_args=(X_val_biased, y_val),
+                                                    callback_args=(X_val, y_val),
                                                     shuffle=self.shuffle,
                                                     random_state=self.random_state,
                                                     verbose=self.verbose).minimize()
@@ -1071,12 +1457,13 @@ class SVR(RegressorMixin, SVM):
                 else:
 
                     self.optimizer = self.optimizer(f=self.loss,
+                                                    x=self._warm_start_coef(self.loss.ndim),
                                                     epochs=self.max_iter,
                                                     step_size=(self.loss.step_size if self.learning_rate == 'auto'
                                                                else self.learning_rate),
                                                     batch_size=self.batch_size,
                                                     callback=self._store_train_val_info,
-                                                    callback_args=(X_val_biased, y_val),
+                                                    callback_args=(X_val, y_val),
                                                     shuffle=self.shuffle,
                                                     random_state=self.random_state,
                                                     verbose=self.verbose).minimize()
@@ -1085,32 +1472,41 @@ class SVR(RegressorMixin, SVM):
 
                 raise TypeError(f'{self.optimizer} is not an allowed optimizer')
 
-            self.support_ = np.argwhere(np.abs(y - self.predict(X)) >= self.epsilon).ravel()
-            self.support_vectors_ = X[self.support_]
+            self.support_ = rows[np.abs(y - self._decision_function(X)) >= self.epsilon]
+            self.support_vectors_ = samples[self.support_]
 
         else:
 
             n_samples = len(y)
 
             # kernel matrix
-            K = self.kernel(X)
-
-            Q = np.vstack((np.hstack((K, -K)),
-                           np.hstack((-K, K))))
+            K = self._kernel_matrix(X)
+
+            # the Hessian [[K, -K], [-K, K]] is never formed explicitly, i.e., it is
+            # applied through K, as well as the regularized intercept e e^T and the
+            # diagonal of the squared epsilon-insensitive, so the memory footprint
+            # is just the one of K rather than of a matrix 4 times larger
+            Q = (SignedKernelMatrix(K, np.hstack((np.ones(n_samples), -np.ones(n_samples))),
+                                    intercept=1. if self.reg_intercept else 0.,
+                                    diagonal=1 / (2 * self.C) if self.loss == SquaredEpsilonInsensitive else 0.)
+                 if not isinstance(K, KernelCache) else None)
             q = np.hstack((-y, y)) + self.epsilon
 
             if self.loss == EpsilonInsensitive:
 
                 ub = np.ones(2 * n_samples) * self.C  # upper bounds
 
-                if self.optimizer == 'smo' or self.optimizer == SMO:
+                if self._is_smo():
 
                     if not self.reg_intercept:
 
-                        self.obj = Quadratic(Q, q)
+                        self.obj = Quadratic(Q, q) if Q is not None else None
 
-                        self.optimizer = SMORegression(self.obj, X, y, K, self.kernel, self.C,
-                                                       self.epsilon, self.tol, self.verbose).minimize()
+                        smo = SMORegression if self.optimizer in ('smo', SMO) else self.optimizer
+                        if not issubclass(smo, SMORegression):
+                            raise TypeError(f'{smo} is not an allowed SVR optimizer')
+                        self.optimizer = smo(self.obj, X, y, K, self.kernel, self.C, self.epsilon,
+                                             self.tol, self.verbose, self.shrinking).minimize()
                         alphas_p, alphas_n = self.optimizer.alphas_p, self.optimizer.alphas_n
                         self.alphas_ = np.concatenate((alphas_p, alphas_n))
                         if isinstance(self.kernel, LinearKernel):
@@ -1134,29 +1530,28 @@ class SVR(RegressorMixin, SVM):
                             self.obj = Quadratic(Q, q)
 
                             out = StringIO()
-                            with pipes(stdout=out, stderr=STDOUT):
-                                self.alphas_ = solve_qp(P=Q,
-                                                        q=q,
-                                                        A=e,
-                                                        b=np.zeros(1),
-                                                        lb=lb,
-                                                        ub=ub,
-                                                        solver=self.optimizer,
-                                                        verbose=False if self.verbose < 0 else True)  # trick for Jupyter
+                            with wurlitzer.pipes(stdout=out, stderr=wurlitzer.STDOUT):
+                                self.alphas_ = qpsolvers.solve_qp(P=np.array(Q),
+                                                                  q=q,
+                                                                  A=e,
+                                                                  b=np.zeros(1),
+                                                                  lb=lb,
+                                                                  ub=ub,
+                                                                  solver=self.optimizer,
+                                                                  verbose=False if self.verbose < 0 else True)  # trick for Jupyter
 
                         else:
 
-                            Q += np.outer(e, e)
                             self.obj = Quadratic(Q, q)
 
                             out = StringIO()
-                            with pipes(stdout=out, stderr=STDOUT):
-                                self.alphas_ = solve_qp(P=Q,
-                                                        q=q,
-                                                        lb=lb,
-                                                        ub=ub,
-                                                        solver=self.optimizer,
-                                                        verbose=False if self.verbose < 0 else True)  # trick for Jupyter
+                            with wurlitzer.pipes(stdout=out, stderr=wurlitzer.STDOUT):
+                                self.alphas_ = qpsolvers.solve_qp(P=np.array(Q),
+                                                                  q=q,
+                                                                  lb=lb,
+                                                                  ub=ub,
+                                                                  solver=self.optimizer,
+                                                                  verbose=False if self.verbose < 0 else True)  # trick for Jupyter
 
                         stdout = out.getvalue()
                         if stdout:
@@ -1168,18 +1563,25 @@ class SVR(RegressorMixin, SVM):
 
                         if issubclass(self.optimizer, BoxConstrainedQuadraticOptimizer):
 
+                            eq_constraint = {}
+
                             if not self.reg_intercept:
 
-                                # TODO constrained optimizer with A x = 0 and 0 <= x <= ub is not available
-                                raise NotImplementedError
+                                # only the SpectralProjectedGradient handles the A x = 0 constraint
+                                if not issubclass(self.optimizer, SpectralProjectedGradient):
+                                    raise NotImplementedError
+
+                                self.obj = Quadratic(Q, q)
+                                eq_constraint = {'A': e, 'b': 0.}
 
                             else:
 
-                                Q += np.outer(e, e)
                                 self.obj = Quadratic(Q, q)
 
                             self.optimizer = self.optimizer(quad=self.obj,
                                                             ub=ub,
+                                                            x=self._warm_start_alphas(ub.size),
+                                                            **eq_constraint,
                                                             tol=self.tol,
                                                             max_iter=self.max_iter,
                                                             callback=self._store_train_info,
@@ -1200,7 +1602,6 @@ class SVR(RegressorMixin, SVM):
 
                             else:
 
-                                Q += np.outer(e, e)
                                 self.obj = AugmentedLagrangianQuadratic(primal=Quadratic(Q, q),
                                                                         lb=lb,
                                                                         ub=ub,
@@ -1278,9 +1679,6 @@ class SVR(RegressorMixin, SVM):
 
             elif self.loss == SquaredEpsilonInsensitive:
 
-                D = np.diag(np.ones(2 * n_samples) / (2 * self.C))
-                Q += D
-
                 e = np.hstack((np.ones(n_samples), -np.ones(n_samples)))  # equality matrix
 
                 if isinstance(self.optimizer, str):
@@ -1292,27 +1690,26 @@ class SVR(RegressorMixin, SVM):
                         self.obj = Quadratic(Q, q)
 
                         out = StringIO()
-                        with pipes(stdout=out, stderr=STDOUT):
-                            self.alphas_ = solve_qp(P=Q,
-                                                    q=q,
-                                                    A=e,
-                                                    b=np.zeros(1),
-                                                    lb=lb,
-                                                    solver=self.optimizer,
-                                                    verbose=False if self.verbose < 0 else True)  # trick for Jupyter
+                        with wurlitzer.pipes(stdout=out, stderr=wurlitzer.STDOUT):
+                            self.alphas_ = qpsolvers.solve_qp(P=np.array(Q),
+                                                              q=q,
+                                                              A=e,
+                                                              b=np.zeros(1),
+                                                              lb=lb,
+                                                              solver=self.optimizer,
+                                                              verbose=False if self.verbose < 0 else True)  # trick for Jupyter
 
                     else:
 
-                        Q += np.outer(e, e)
                         self.obj = Quadratic(Q, q)
 
                         out = StringIO()
-                        with pipes(stdout=out, stderr=STDOUT):
-                            self.alphas_ = solve_qp(P=Q,
-                                                    q=q,
-                                                    lb=lb,
-                                                    solver=self.optimizer,
-                                                    verbose=False if self.verbose < 0 else True)  # trick for Jupyter
+                        with wurlitzer.pipes(stdout=out, stderr=wurlitzer.STDOUT):
+                            self.alphas_ = qpsolvers.solve_qp(P=np.array(Q),
+                                                              q=q,
+                                                              lb=lb,
+                                                              solver=self.optimizer,
+                                                              verbose=False if self.verbose < 0 else True)  # trick for Jupyter
 
                     stdout = out.getvalue()
                     if stdout:
@@ -1324,8 +1721,31 @@ class SVR(RegressorMixin, SVM):
 
                     if issubclass(self.optimizer, BoxConstrainedQuadraticOptimizer):
 
-                        # TODO bcqp optimizer with 0 <= x <= +inf, i.e., without upper bound, is not available
-                        raise NotImplementedError
+                        ub = np.full(2 * n_samples, np.inf)  # no upper bounds
+
+                        eq_constraint = {}
+
+                        if not self.reg_intercept:
+
+                            # only the SpectralProjectedGradient handles the A x = 0 constraint
+                            if not issubclass(self.optimizer, SpectralProjectedGradient):
+                                raise NotImplementedError
+
+                            self.obj = Quadratic(Q, q)
+                            eq_constraint = {'A': e, 'b': 0.}
+
+                        else:
+
+                            self.obj = Quadratic(Q, q)
+
+                        self.optimizer = self.optimizer(quad=self.obj,
+                                                        ub=ub,
+                                                        x=self._warm_start_alphas(ub.size),
+                                                        **eq_constraint,
+                                                        tol=self.tol,
+                                                        max_iter=self.max_iter,
+                                                        callback=self._store_train_info,
+                                                        verbose=self.verbose).minimize()
 
                     elif issubclass(self.optimizer, Optimizer):
 
@@ -1341,7 +1761,6 @@ class SVR(RegressorMixin, SVM):
 
                         else:
 
-                            Q += np.outer(e, e)
                             self.obj = AugmentedLagrangianQuadratic(primal=Quadratic(Q, q),
                                                                     lb=lb,
                                                                     rho=self.rho)
@@ -1422,21 +1841,25 @@ class SVR(RegressorMixin, SVM):
 
             sv = np.logical_or(alphas_p > 1e-6, alphas_n > 1e-6)
             self.support_ = np.arange(len(alphas_p))[sv]
-            self.support_vectors_, sv_y, alphas_p, alphas_n = X[sv], y[sv], alphas_p[sv], alphas_n[sv]
+            self.support_vectors_ = self._dual_support_vectors(X)
+            alphas_p, alphas_n = alphas_p[sv], alphas_n[sv]
             self.dual_coef_ = alphas_p - alphas_n
+            self.kernel_ = self.kernel.bind(X, self._kernel_support())
 
-            if self.optimizer != SMORegression:
+            # the SMO solvers already hold the bias from their own KKT gradient
+            if not isinstance(self.optimizer, SMO):
 
                 if isinstance(self.kernel, LinearKernel):
                     self.coef_ = np.dot(self.dual_coef_, self.support_vectors_)
 
-                for n in range(len(alphas_p)):
-                    self.intercept_ += sv_y[n]
-                    self.intercept_ -= np.sum(self.dual_coef_ * K[self.support_[n], sv])
-                self.intercept_ -= self.epsilon
-                self.intercept_ /= len(alphas_p)
+                self.intercept_ = self._dual_intercept(Q, q, np.hstack((np.ones(n_samples), -np.ones(n_samples))),
+                                                       self.C if self.loss == EpsilonInsensitive else np.inf)
 
         return self
 
-    def predict(self, X):
-        return self.decision_function(X)
+    def predict(self, X, batch_size=None, n_jobs=None):
+        return self.decision_function(X, batch_size, n_jobs)
+
+    def _score(self, X, y):
+        # the r2 score wrt the instance vectors in the feature space of the primal model
+        return r2_score(y, self._decision_function(X))
@@ -1,9 +1,14 @@
 from abc import ABC
+from collections import OrderedDict
+from copy import copy
 
 import numpy as np
-from sklearn.base import BaseEstimator
+from scipy.linalg import svd
+from scipy.sparse.linalg import LinearOperator
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.metrics.pairwise import check_pairwise_arrays, euclidean_distances, manhattan_distances
-from sklearn.utils.extmath import safe_sparse_dot
+from sklearn.utils import check_array, check_random_state, gen_batches, get_chunk_n_rows
+from sklearn.utils.extmath import safe_sparse_dot, row_norms
 
 
 class Kernel(BaseEstimator, ABC):
@@ -11,6 +16,103 @@ class Kernel(BaseEstimator, ABC):
     def __call__(self, X, Y=None):
         raise NotImplementedError
 
+    def diag(self, X):
+        """
+        Returns the diagonal of the kernel K(X, X) without
+        computing the whole kernel matrix.
+        """
+        raise NotImplementedError
+
+    def _gamma(self, X):
+        return (1. / (X.shape[1] * X.var()) if self.gamma == 'scale' else
+                1. / X.shape[1] if self.gamma == 'auto' else self.gamma)
+
+    def bind(self, X, Y=None):
+        """
+        Returns a copy of the kernel whose data dependent parameters,
+        i.e., gamma, are resolved wrt X, so that it computes the same
+        values of K(X, Y) when it is evaluated on a subset of X.
+
+        If Y is given, the quantities that only depend on Y, e.g., its
+        squared row norms, are also cached so that the next evaluations
+        of K(., Y) just compute the terms depending on both arguments.
+        """
+        kernel = copy(self)
+        if isinstance(getattr(self, 'gamma', None), str):
+            kernel.gamma = self._gamma(X)
+        kernel._Y = Y
+        if Y is not None:
+            kernel._cache(Y)
+        return kernel
+
+    def _cache(self, Y):
+        pass
+
+    def iter_blocks(self, X, Y=None, batch_size=None):
+        """
+        Generates the kernel K(X, Y) by row tiles, i.e., it yields the pairs
+        (rows, K(X[rows], Y)) where rows is a slice of at most batch_size rows
+        of X, so that the temporaries allocated to compute the kernel are
+        bounded by the size of a single tile.
+
+        Parameters
+        ----------
+
+        X : {array-like, sparse matrix} of shape (n_samples_X, n_features)
+
+        Y : {array-like, sparse matrix} of shape (n_samples_Y, n_features), default=None
+            If None, uses Y=X.
+
+        batch_size : int, default=None
+            Number of rows of X in each tile. If None, it is chosen such that
+            a tile fits in the sklearn ``working_memory``.
+        """
+        X, Y = check_pairwise_arrays(X, Y)
+        if batch_size is None:
+            batch_size = get_chunk_n_rows(row_bytes=8 * Y.shape[0], max_n_rows=X.shape[0])
+        elif not batch_size > 0:
+            raise ValueError('batch_size must be > 0')
+        if batch_size >= X.shape[0]:  # a single tile, i.e., the whole kernel
+            yield slice(0, X.shape[0]), self(X, Y)
+            return
+        kernel = self.bind(X, Y)
+        for rows in gen_batches(X.shape[0], batch_size):
+            yield rows, kernel(X[rows], Y)
+
+    def gram(self, X, Y=None, batch_size=None, out=None, dtype=np.float64):
+        """
+        Compute the kernel K(X, Y) by row tiles of X, see `iter_blocks`, with
+        a bounded peak memory other than the result itself.
+
+        Parameters
+        ----------
+
+        X : {array-like, sparse matrix} of shape (n_samples_X, n_features)
+
+        Y : {array-like, sparse matrix} of shape (n_samples_Y, n_features), default=None
+            If None, uses Y=X.
+
+        batch_size : int, default=None
+            Number of rows of X in each tile. If None, it is chosen such that
+            a tile fits in the sklearn ``working_memory``.
+
+        out : ndarray of shape (n_samples_X, n_samples_Y), default=None
+            Array in which to store the result, e.g., a `np.memmap` to compute
+            the kernel matrix out-of-core. If None, a new array is allocated.
+
+        dtype : {np.float64, np.float32}, default=np.float64
+            The data type of the result. Ignored if ``out`` is given.
+        """
+        X, Y = check_pairwise_arrays(X, Y)
+        shape = (X.shape[0], Y.shape[0])
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        elif out.shape != shape:
+            raise ValueError(f'out must have shape {shape}, got {out.shape}')
+        for rows, block in self.iter_blocks(X, Y, batch_size):
+            out[rows] = block
+        return out
+
 
 class LinearKernel(Kernel):
     """
@@ -23,6 +125,10 @@ class LinearKernel(Kernel):
         X, Y = check_pairwise_arrays(X, Y)
         return safe_sparse_dot(X, Y.T, dense_output=True)
 
+    def diag(self, X):
+        X = check_array(X, accept_sparse='csr')
+        return row_norms(X, squared=True)
+
 
 class PolyKernel(Kernel):
     """
@@ -61,10 +167,14 @@ class PolyKernel(Kernel):
 
     def __call__(self, X, Y=None):
         X, Y = check_pairwise_arrays(X, Y)
-        gamma = (1. / (X.shape[1] * X.var()) if self.gamma == 'scale' else
-                 1. / X.shape[1] if self.gamma == 'auto' else self.gamma)
+        gamma = self._gamma(X)
         return (gamma * safe_sparse_dot(X, Y.T, dense_output=True) + self.coef0) ** self.degree
 
+    def diag(self, X):
+        X = check_array(X, accept_sparse='csr')
+        gamma = self._gamma(X)
+        return (gamma * row_norms(X, squared=True) + self.coef0) ** self.degree
+
 
 class GaussianKernel(Kernel):
     """
@@ -92,11 +202,29 @@ class GaussianKernel(Kernel):
         self.gamma = gamma
 
     def __call__(self, X, Y=None):
+        if Y is not None and Y is getattr(self, '_Y', None):
+            # Y has been already validated and its squared norms cached
+            # by bind, so just compute the cross term and the exp
+            X = check_array(X, accept_sparse='csr')
+            K = safe_sparse_dot(X, self._Y_valid.T, dense_output=True)
+            K *= -2
+            K += row_norms(X, squared=True)[:, np.newaxis]
+            K += self._Y_norm_squared
+            np.maximum(K, 0, out=K)
+            K *= -self._gamma(X)
+            return np.exp(K, out=K)
         X, Y = check_pairwise_arrays(X, Y)
-        gamma = (1. / (X.shape[1] * X.var()) if self.gamma == 'scale' else
-                 1. / X.shape[1] if self.gamma == 'auto' else self.gamma)
+        gamma = self._gamma(X)
         return np.exp(-gamma * euclidean_distances(X, Y, squared=True))
 
+    def _cache(self, Y):
+        self._Y_valid = check_array(Y, accept_sparse='csr')
+        self._Y_norm_squared = row_norms(self._Y_valid, squared=True)[np.newaxis, :]
+
+    def diag(self, X):
+        X = check_array(X, accept_sparse='csr')
+        return np.ones(X.shape[0])
+
 
 class LaplacianKernel(Kernel):
     """
@@ -125,10 +253,13 @@ class LaplacianKernel(Kernel):
 
     def __call__(self, X, Y=None):
         X, Y = check_pairwise_arrays(X, Y)
-        gamma = (1. / (X.shape[1] * X.var()) if self.gamma == 'scale' else
-                 1. / X.shape[1] if self.gamma == 'auto' else self.gamma)
+        gamma = self._gamma(X)
         return np.exp(-gamma * manhattan_distances(X, Y))
 
+    def diag(self, X):
+        X = check_array(X, accept_sparse='csr')
+        return np.ones(X.shape[0])
+
 
 class SigmoidKernel(Kernel):
     """
@@ -161,13 +292,357 @@ class SigmoidKernel(Kernel):
 
     def __call__(self, X, Y=None):
         X, Y = check_pairwise_arrays(X, Y)
-        gamma = (1. / (X.shape[1] * X.var()) if self.gamma == 'scale' else
-                 1. / X.shape[1] if self.gamma == 'auto' else self.gamma)
+        gamma = self._gamma(X)
         return np.tanh(gamma * safe_sparse_dot(X, Y.T, dense_output=True) + self.coef0)
 
+    def diag(self, X):
+        X = check_array(X, accept_sparse='csr')
+        gamma = self._gamma(X)
+        return np.tanh(gamma * row_norms(X, squared=True) + self.coef0)
+
+
+class PrecomputedKernel(Kernel):
+    """
+    The kernel precomputed by the user, e.g., offline and stored in a
+    `np.memmap`, so that the samples are the rows of the kernel matrix
+    wrt the training samples, i.e.:
+
+        - X given to ``fit`` is K(X_train, X_train) of shape (n_samples, n_samples),
+        - X given to ``decision_function`` and ``predict`` is K(X_test, X_train)
+          of shape (n_samples_test, n_samples).
+
+    So, the columns of X index the training samples and K(X, Y) = X[:, Y]
+    where Y is an array of indices of the training samples, e.g., the ones
+    of the support vectors.
+    """
+
+    def __call__(self, X, Y=None):
+        X = check_array(X)
+        n_samples = getattr(self, '_n_samples', None)
+        if n_samples is not None and X.shape[1] != n_samples:
+            raise ValueError(f'X must have {n_samples} columns, i.e., the number of '
+                             f'training samples, got {X.shape[1]}')
+        if Y is None:
+            return X
+        return X[:, Y]
+
+    def diag(self, X):
+        return np.diagonal(check_array(X)).copy()
+
+    def bind(self, X, Y=None):
+        kernel = super(PrecomputedKernel, self).bind(X, Y)
+        # to check the number of columns of the kernel at test time
+        kernel._n_samples = X.shape[0]
+        return kernel
+
+    def gram(self, X, Y=None, batch_size=None, out=None, dtype=np.float64):
+        # the kernel matrix is X itself, so it is not copied, e.g., a
+        # np.memmap is just validated and then read from disk on demand
+        if Y is not None:
+            X = self(X, Y)
+        else:
+            X = check_array(X, dtype=(np.float64, np.float32))
+            if X.shape[0] != X.shape[1]:
+                raise ValueError(f'a precomputed kernel matrix must be square, got shape {X.shape}')
+        if out is not None:
+            out[:] = X
+            return out
+        return X
+
+
+class KernelApproximation(BaseEstimator, TransformerMixin, ABC):
+    """
+    Base class for the approximate feature maps z of a kernel, i.e.,
+    K(X, Y) ~ <z(X), z(Y)>, so that a linear model trained in the primal
+    on z(X) approximates the kernel machine trained in the dual on X.
+    """
+
+    def __init__(self, kernel, n_components=100, random_state=None):
+        self.kernel = kernel
+        if not n_components > 0:
+            raise ValueError('n_components must be > 0')
+        self.n_components = n_components
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        raise NotImplementedError
+
+    def transform(self, X):
+        raise NotImplementedError
+
+
+class RandomFourierFeatures(KernelApproximation):
+    """
+    Approximate the feature map of the gaussian or the laplacian RBF kernel
+    by Monte Carlo sampling of its Fourier transform:
+
+        z(x) = sqrt(2 / n_components) cos(W^T x + b)
+
+    where the columns of W are drawn from the Fourier transform of the kernel,
+    i.e., a normal distribution for the gaussian and a Cauchy distribution for
+    the laplacian kernel, and b is drawn uniformly from [0, 2pi].
+
+    Parameters
+    ----------
+
+    kernel : `GaussianKernel` or `LaplacianKernel` instance, default=gaussian
+        The kernel to approximate. If gamma is 'scale' or 'auto' it is
+        resolved wrt the training set.
+
+    n_components : int, default=100
+        Number of Monte Carlo samples, i.e., dimension of the feature space.
+
+    random_state : int, RandomState instance or None, default=None
+        Controls the random sampling of W and b.
+
+    References
+    ----------
+
+    A. Rahimi, B. Recht. Random Features for Large-Scale Kernel Machines. NIPS 2007.
+    """
+
+    def __init__(self, kernel=None, n_components=100, random_state=None):
+        if kernel is None:
+            kernel = gaussian
+        if not isinstance(kernel, (GaussianKernel, LaplacianKernel)):
+            raise TypeError(f'{kernel} cannot be approximated by random fourier features')
+        super(RandomFourierFeatures, self).__init__(kernel=kernel,
+                                                    n_components=n_components,
+                                                    random_state=random_state)
+
+    def fit(self, X, y=None):
+        X = check_array(X, accept_sparse='csr')
+        random_state = check_random_state(self.random_state)
+        gamma = self.kernel._gamma(X)
+        size = (X.shape[1], self.n_components)
+        if isinstance(self.kernel, GaussianKernel):
+            self.random_weights_ = np.sqrt(2 * gamma) * random_state.normal(size=size)
+        else:
+            self.random_weights_ = gamma * random_state.standard_cauchy(size=size)
+        self.random_offset_ = random_state.uniform(0, 2 * np.pi, size=self.n_components)
+        return self
+
+    def transform(self, X):
+        X = check_array(X, accept_sparse='csr')
+        projection = safe_sparse_dot(X, self.random_weights_)
+        projection += self.random_offset_
+        np.cos(projection, out=projection)
+        projection *= np.sqrt(2. / self.n_components)
+        return projection
+
+
+class Nystroem(KernelApproximation):
+    """
+    Approximate the feature map of any kernel using a subset of the
+    training set as landmarks, i.e., the components:
+
+        z(x) = K(x, components) K(components, components)^-1/2
+
+    so that <z(X), z(Y)> is the Nystrom low-rank approximation of K(X, Y).
+
+    Parameters
+    ----------
+
+    kernel : `Kernel` instance, default=gaussian
+        The kernel to approximate. If gamma is 'scale' or 'auto' it is
+        resolved wrt the training set.
+
+    n_components : int, default=100
+        Number of training samples used as landmarks, i.e.,
+        dimension of the feature space.
+
+    random_state : int, RandomState instance or None, default=None
+        Controls the random sampling of the landmarks.
+
+    References
+    ----------
+
+    C.K.I. Williams, M. Seeger. Using the Nystrom Method to Speed Up Kernel Machines. NIPS 2001.
+    """
+
+    def __init__(self, kernel=None, n_components=100, random_state=None):
+        if kernel is None:
+            kernel = gaussian
+        if not isinstance(kernel, Kernel):
+            raise TypeError(f'{kernel} is not an allowed kernel function')
+        super(Nystroem, self).__init__(kernel=kernel,
+                                       n_components=n_components,
+                                       random_state=random_state)
+
+    def fit(self, X, y=None):
+        X = check_array(X, accept_sparse='csr')
+        random_state = check_random_state(self.random_state)
+        n_samples = X.shape[0]
+        self.component_indices_ = random_state.permutation(n_samples)[:min(n_samples, self.n_components)]
+        self.components_ = X[self.component_indices_]
+        self.kernel_ = self.kernel.bind(X, self.components_)
+        U, S, V = svd(self.kernel_(self.components_, self.components_))
+        # the pseudo-inverse square root of K(components, components)
+        self.normalization_ = np.dot(U / np.sqrt(np.maximum(S, 1e-12)), V)
+        return self
+
+    def transform(self, X):
+        return np.dot(self.kernel_(X, self.components_), self.normalization_.T)
+
+
+class KernelCache:
+    """
+    Compute the columns of the kernel matrix K(X, X) on demand and keep
+    the most recently used ones in a bounded LRU cache, so that the memory
+    footprint scales with ``cache_size`` instead of n_samples^2.
+
+    It exposes the subset of the ndarray interface used by the SMO solvers:
+
+        - K[i] returns the i-th column (i.e., row) of the kernel matrix,
+        - K[i, j] returns the (i, j) entry(ies) of the kernel matrix, where
+          j can be an integer, a slice, a boolean mask or an array of indices,
+        - K.diagonal() returns the diagonal of the kernel matrix.
+
+    Parameters
+    ----------
+
+    kernel : `Kernel` instance
+        The kernel function used to compute the columns of the kernel matrix.
+
+    X : ndarray of shape (n_samples, n_features)
+        Training vectors.
+
+    cache_size : float, default=200
+        Size of the kernel cache (in MB).
+    """
+
+    def __init__(self, kernel, X, cache_size=200):
+        if not isinstance(kernel, Kernel):
+            raise TypeError(f'{kernel} is not an allowed kernel function')
+        self.kernel = kernel
+        self.X = X
+        if not cache_size > 0:
+            raise ValueError('cache_size must be > 0')
+        self.cache_size = cache_size
+        n_samples = X.shape[0]
+        self.shape = (n_samples, n_samples)
+        # freeze gamma and cache the squared norms of X
+        # since each column is computed as K(X[i], X)
+        self._kernel = kernel.bind(X, X)
+        # the number of columns that fit in cache_size MB, but at least two
+        # since each SMO step needs the columns of both the working variables
+        self.max_columns = max(2, int(cache_size * 2 ** 20 // (n_samples * np.dtype(float).itemsize)))
+        self._columns = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self.shape[0]
+
+    def diagonal(self):
+        if not hasattr(self, '_diagonal'):
+            self._diagonal = self.kernel.diag(self.X)
+        return self._diagonal
+
+    def column(self, i):
+        if i in self._columns:
+            self._columns.move_to_end(i)
+            self.hits += 1
+        else:
+            if len(self._columns) >= self.max_columns:
+                self._columns.popitem(last=False)  # evict the least recently used column
+            # the matrix is symmetric, so the i-th column is also the i-th row
+            self._columns[i] = self._kernel(self.X[i:i + 1], self.X).ravel()
+            self.misses += 1
+        return self._columns[i]
+
+    def __getitem__(self, idx):
+        if isinstance(idx, tuple):
+            i, j = idx
+            if (i not in self._columns and
+                    isinstance(j, (int, np.integer)) and j in self._columns):
+                i, j = j, i  # exploit the symmetry to avoid a miss
+            return self.column(i)[j]
+        return self.column(idx)
+
+
+class SignedKernelMatrix(LinearOperator):
+    """
+    The Hessian of the SVM duals built on top of the kernel matrix K without
+    forming it explicitly, i.e.:
+
+        Q = diag(s) (K_s + c 1 1^T) diag(s) + d I
+
+    where K_s is K tiled as [K] for the SVC dual, with s = y, and as [[K, K],
+    [K, K]] for the SVR dual, with s = [1, -1], so that its memory footprint
+    is just the one of K, i.e., the products with Q cost a single product
+    with K, and the entries of Q are computed on demand. The term c 1 1^T
+    comes from the regularized intercept, while d I from the squared losses.
+
+    It is a `LinearOperator`, so it can be used as Q of a `Quadratic`, and it
+    also exposes the subset of the ndarray interface used by the solvers:
+
+        - Q[i, j] returns the (i, j) entry(ies) of Q, where i and j can be
+          integers, slices or arrays of indices, e.g., from np.ix_,
+        - np.array(Q) returns the dense matrix, e.g., to solve a Newton system.
+
+    Parameters
+    ----------
+
+    K : ndarray of shape (n_samples, n_samples)
+        The kernel matrix.
+
+    signs : ndarray of shape (n_samples,) or (2 * n_samples,)
+        The signs of the dual variables, i.e., y for the SVC dual or
+        [1, -1] for the SVR dual.
+
+    intercept : float, default=0.
+        The weight of the regularized intercept term c.
+
+    diagonal : float, default=0.
+        The diagonal term d, e.g., 1 / (2 C) for the squared losses.
+    """
+
+    def __init__(self, K, signs, intercept=0., diagonal=0.):
+        n_samples = K.shape[0]
+        if K.shape != (n_samples, n_samples):
+            raise ValueError('K must be a square matrix')
+        self.signs = np.asarray(signs, dtype=float)
+        if self.signs.size not in (n_samples, 2 * n_samples):
+            raise ValueError('signs must have n_samples or 2 * n_samples entries')
+        super(SignedKernelMatrix, self).__init__(dtype=np.float64, shape=(self.signs.size, self.signs.size))
+        self.K = K
+        self.intercept = intercept
+        self.diagonal = diagonal
+        self.n_blocks = self.signs.size // n_samples
+        # the sample of each dual variable, i.e., its row of K
+        self._samples = np.tile(np.arange(n_samples), self.n_blocks)
+
+    def _matmat(self, X):
+        X = np.asarray(X, dtype=float)
+        # sum the signed dual variables of each sample, e.g., alphas_p - alphas_n
+        W = (self.signs[:, None] * X).reshape(self.n_blocks, self.K.shape[0], -1).sum(axis=0)
+        KW = self.K.dot(W) + self.intercept * W.sum(axis=0)
+        return self.signs[:, None] * np.tile(KW, (self.n_blocks, 1)) + self.diagonal * X
+
+    def _matvec(self, x):
+        return self._matmat(np.reshape(x, (-1, 1))).ravel()
+
+    def _adjoint(self):
+        return self  # Q is symmetric
+
+    def __getitem__(self, idx):
+        i, j = idx if isinstance(idx, tuple) else (idx, slice(None))
+        i, j = np.arange(self.shape[0])[i], np.arange(self.shape[1])[j]
+        return (self.signs[i] * self.signs[j] * (self.K[self._samples[i], self._samples[j]] + self.intercept) +
+                self.diagonal * (i == j))
+
+    def __array__(self, dtype=None):
+        Q = np.tile(self.K, (self.n_blocks, self.n_blocks)) + self.intercept
+        Q *= self.signs[:, None]
+        Q *= self.signs[None, :]
+        Q[np.diag_indices_from(Q)] += self.diagonal
+        return Q if dtype is None else Q.astype(dtype, copy=False)
+
 
 linear = LinearKernel()
 poly = PolyKernel()
 gaussian = GaussianKernel()
 laplacian = LaplacianKernel()
 sigmoid = SigmoidKernel()
+precomputed = PrecomputedKernel()
@@ -1,18 +1,33 @@
 from abc import ABC
+from weakref import ref
 
-import autograd.numpy as np
+import autograd.numpy as anp
+import numpy as np
+from scipy.sparse import issparse
+from sklearn.utils.extmath import row_norms
 
 from .kernels import linear
 from ...opti import OptimizationFunction
 
 
 class SVMLoss(OptimizationFunction, ABC):
+    """
+    The analytic jacobian is computed with plain numpy, while the function
+    (i.e., the decision function and the loss) is written with autograd.numpy
+    since it is traced by autograd to compute the Hessian, e.g., for Newton.
+    """
 
     def __init__(self, svm, X, y):
-        super(SVMLoss, self).__init__(X.shape[1])
+        # the intercept is handled implicitly as the weight of a synthetic
+        # feature with constant value equals to ``intercept_scaling``, packed
+        # as the last entry of the vector, so X is never copied (and it can
+        # be a scipy.sparse CSR matrix when the optimizer does not need the
+        # Hessian, i.e., not for the Newton method)
+        super(SVMLoss, self).__init__(X.shape[1] + 1 if svm.fit_intercept else X.shape[1])
         self.svm = svm
         self.X = X
         self.y = y
+        self._step_sizes = {}
 
     def args(self):
         return self.X, self.y
@@ -42,8 +57,8 @@ class SVMLoss(OptimizationFunction, ABC):
                                                   dual=True,
                                                   optimizer='cvxopt',
                                                   verbose=-1)
-                dual_svm.fit(self.X[:, :-1], self.y)
-                self.x_opt = np.hstack((dual_svm.coef_, dual_svm.intercept_))
+                dual_svm.fit(self.X, self.y)
+                self.x_opt = np.hstack((dual_svm.coef_, dual_svm.intercept_ / self.svm.intercept_scaling))
             return self.x_opt
         return super(SVMLoss, self).x_star()
 
@@ -54,9 +69,40 @@ class SVMLoss(OptimizationFunction, ABC):
             y_batch = self.y
 
         n_samples = X_batch.shape[0]
-        y_pred = np.dot(X_batch, packed_coef_inter)  # svm decision function
-        return (1 / (2 * n_samples) * np.linalg.norm(packed_coef_inter) ** 2 +  # regularization term
-                self.svm.C / n_samples * np.sum(self.loss(y_pred, y_batch)))  # loss term
+        y_pred = self.decision_function(packed_coef_inter, X_batch)
+        return (1 / (2 * n_samples) * anp.linalg.norm(packed_coef_inter) ** 2 +  # regularization term
+                self.svm.C / n_samples * anp.sum(self.loss(y_pred, y_batch)))  # loss term
+
+    def decision_function(self, packed_coef_inter, X_batch):
+        if self.svm.fit_intercept:
+            coef, inter = packed_coef_inter[:-1], packed_coef_inter[-1]
+        else:
+            coef, inter = packed_coef_inter, 0.
+        if issparse(X_batch):
+            y_pred = X_batch.dot(coef)
+        else:
+            y_pred = anp.dot(X_batch, coef)
+        return y_pred + self.svm.intercept_scaling * inter
+
+    def decision_function_jacobian(self, weights, X_batch):
+        """
+        Compute the weighted sum of the jacobians of the decision function wrt
+        the packed coef_ and intercept_ evaluated at each sample, i.e., X^T w
+        with the sum of the weights (scaled by ``intercept_scaling``) appended.
+        """
+        coef_jac = X_batch.T.dot(weights)
+        if self.svm.fit_intercept:
+            return np.append(coef_jac, self.svm.intercept_scaling * np.sum(weights))
+        return coef_jac
+
+    def squared_norm(self, X_batch):
+        """
+        Compute the squared Frobenius norm of the (implicitly biased) X_batch.
+        """
+        squared_norm = row_norms(X_batch, squared=True).sum()
+        if self.svm.fit_intercept:
+            squared_norm += X_batch.shape[0] * self.svm.intercept_scaling ** 2
+        return squared_norm
 
     def loss(self, y_pred, y_true):
         raise NotImplementedError
@@ -73,9 +119,49 @@ class SVMLoss(OptimizationFunction, ABC):
                     packed_coef_inter, X_batch, y_batch))  # jacobian wrt the loss term
 
     def loss_jacobian(self, packed_coef_inter, X_batch, y_batch):
+        y_pred = self.decision_function(packed_coef_inter, X_batch)
+        _, weights = self._loss_and_weights(y_pred, y_batch)
+        return self.decision_function_jacobian(weights, X_batch)
+
+    def function_jacobian(self, packed_coef_inter, X_batch=None, y_batch=None):
+        # the decision function, and so the active samples, are computed
+        # once and shared between the function and the jacobian, so each
+        # evaluation does a single pass over the data
+        if X_batch is None:
+            X_batch = self.X
+        if y_batch is None:
+            y_batch = self.y
+
+        n_samples = X_batch.shape[0]
+        y_pred = self.decision_function(packed_coef_inter, X_batch)
+        loss, weights = self._loss_and_weights(y_pred, y_batch)
+        return ((1 / (2 * n_samples) * np.linalg.norm(packed_coef_inter) ** 2 +  # regularization term
+                 self.svm.C / n_samples * np.sum(loss)),  # loss term
+                ((1 / n_samples) * packed_coef_inter -  # jacobian wrt the regularization term
+                 self.svm.C / n_samples * self.decision_function_jacobian(
+                     weights, X_batch)))  # jacobian wrt the loss term
+
+    def _loss_and_weights(self, y_pred, y_true):
+        """
+        Compute the loss of each sample and its weight in the jacobian of the
+        loss, i.e., the partial derivative of the loss wrt the decision function
+        with flipped sign. The weights of the inactive samples are zeroed rather
+        than gathering the active rows of X, so the jacobian is a single product
+        with X^T which never copies X.
+        """
         raise NotImplementedError
 
     def step_size(self, X_batch, y_batch):
+        # the Lipschitz constant only depends on the batch and the stochastic
+        # optimizers slice their batches once, so it is computed only once
+        # for each of them and the entry is dropped when the batch is released
+        key = id(X_batch)
+        if key not in self._step_sizes:
+            self._step_sizes[key] = (1 / self.lipschitz_constant(X_batch),
+                                     ref(X_batch, lambda _: self._step_sizes.pop(key, None)))
+        yield self._step_sizes[key][0]
+
+    def lipschitz_constant(self, X_batch):
         raise NotImplementedError
 
 
@@ -89,24 +175,15 @@ class Hinge(SVMLoss):
     _loss_type = 'classifier'
 
     def loss(self, y_pred, y_true):
-        return np.maximum(0, 1 - y_true * y_pred)
+        return anp.maximum(0, 1 - y_true * y_pred)
 
-    def loss_jacobian(self, packed_coef_inter, X_batch, y_batch):
-        y_pred = np.dot(X_batch, packed_coef_inter)  # svm decision function
-        idx = np.argwhere(y_batch * y_pred < 1.).ravel()
-        return np.dot(y_batch[idx], X_batch[idx])
+    def _loss_and_weights(self, y_pred, y_true):
+        margin = 1 - y_true * y_pred
+        return np.maximum(0, margin), np.where(margin > 0., y_true, 0.)
 
-    def step_size(self, X_batch, y_batch):
-        if np.array_equal(X_batch, self.X):  # no mini batches
-            if not hasattr(self, '_step_size'):
-                n_samples = self.X.shape[0]
-                L = self.svm.C / n_samples * np.linalg.norm(self.X) ** 2
-                self._step_size = 1 / L
-            yield self._step_size
-        else:
-            n_samples = X_batch.shape[0]
-            L = self.svm.C / n_samples * np.linalg.norm(X_batch) ** 2
-            yield 1 / L
+    def lipschitz_constant(self, X_batch):
+        n_samples = X_batch.shape[0]
+        return self.svm.C / n_samples * self.squared_norm(X_batch)
 
 
 class SquaredHinge(Hinge):
@@ -117,28 +194,17 @@ class SquaredHinge(Hinge):
     """
 
     def loss(self, y_pred, y_true):
-        return np.square(super(SquaredHinge, self).loss(y_pred, y_true))
+        return anp.square(super(SquaredHinge, self).loss(y_pred, y_true))
 
-    def loss_jacobian(self, packed_coef_inter, X_batch, y_batch):
-        y_pred = np.dot(X_batch, packed_coef_inter)  # svm decision function
-        idx = np.argwhere(y_batch * y_pred < 1.).ravel()
-        return 2 * np.dot(np.maximum(0, 1 - y_batch[idx] * y_pred[idx]) * y_batch[idx], X_batch[idx])
+    def _loss_and_weights(self, y_pred, y_true):
+        loss, weights = super(SquaredHinge, self)._loss_and_weights(y_pred, y_true)
+        return np.square(loss), 2 * loss * weights
 
-    def step_size(self, X_batch, y_batch):
-        if np.array_equal(X_batch, self.X):  # no mini batches
-            if not hasattr(self, '_step_size'):
-                mu = 1
-                n_samples = self.X.shape[0]
-                L = (1 / n_samples * mu +  # Lipschitz constant wrt the regularization term (strictly convex)
-                     self.svm.C / n_samples * np.linalg.norm(self.X) ** 2)  # Lipschitz constant wrt the loss term
-                self._step_size = 1 / L
-            yield self._step_size
-        else:
-            mu = 1
-            n_samples = X_batch.shape[0]
-            L = (1 / n_samples * mu +  # Lipschitz constant wrt the regularization term (strictly convex)
-                 self.svm.C / n_samples * np.linalg.norm(X_batch) ** 2)  # Lipschitz constant wrt the loss term
-            yield 1 / L
+    def lipschitz_constant(self, X_batch):
+        mu = 1
+        n_samples = X_batch.shape[0]
+        return (1 / n_samples * mu +  # Lipschitz constant wrt the regularization term (strictly convex)
+                self.svm.C / n_samples * self.squared_norm(X_batch))  # Lipschitz constant wrt the loss term
 
 
 class EpsilonInsensitive(SVMLoss):
@@ -155,25 +221,16 @@ class EpsilonInsensitive(SVMLoss):
         self.epsilon = epsilon
 
     def loss(self, y_pred, y_true):
-        return np.maximum(0, np.abs(y_true - y_pred) - self.epsilon)
+        return anp.maximum(0, anp.abs(y_true - y_pred) - self.epsilon)
 
-    def loss_jacobian(self, packed_coef_inter, X_batch, y_batch):
-        y_pred = np.dot(X_batch, packed_coef_inter)  # svm decision function
-        idx = np.argwhere(np.abs(y_batch - y_pred) >= self.epsilon).ravel()
-        z = y_batch[idx] - y_pred[idx]
-        return np.dot(np.sign(z), X_batch[idx])  # or np.dot(np.divide(z, np.abs(z)), X_batch[idx])
+    def _loss_and_weights(self, y_pred, y_true):
+        z = y_true - y_pred
+        excess = np.abs(z) - self.epsilon
+        return np.maximum(0, excess), np.where(excess >= 0., np.sign(z), 0.)  # or np.divide(z, np.abs(z))
 
-    def step_size(self, X_batch, y_batch):
-        if np.array_equal(X_batch, self.X):  # no mini batches
-            if not hasattr(self, '_step_size'):
-                n_samples = self.X.shape[0]
-                L = self.svm.C / n_samples * np.linalg.norm(self.X) ** 2
-                self._step_size = 1 / L
-            yield self._step_size
-        else:
-            n_samples = X_batch.shape[0]
-            L = self.svm.C / n_samples * np.linalg.norm(X_batch) ** 2
-            yield 1 / L
+    def lipschitz_constant(self, X_batch):
+        n_samples = X_batch.shape[0]
+        return self.svm.C / n_samples * self.squared_norm(X_batch)
 
 
 class SquaredEpsilonInsensitive(EpsilonInsensitive):
@@ -184,29 +241,17 @@ class SquaredEpsilonInsensitive(EpsilonInsensitive):
     """
 
     def loss(self, y_pred, y_true):
-        return np.square(super(SquaredEpsilonInsensitive, self).loss(y_pred, y_true))
+        return anp.square(super(SquaredEpsilonInsensitive, self).loss(y_pred, y_true))
 
-    def loss_jacobian(self, packed_coef_inter, X_batch, y_batch):
-        y_pred = np.dot(X_batch, packed_coef_inter)  # svm decision function
-        idx = np.argwhere(np.abs(y_batch - y_pred) >= self.epsilon).ravel()
-        z = y_batch[idx] - y_pred[idx]
-        return 2 * np.dot(np.sign(z) * (np.abs(z) - self.epsilon), X_batch[idx])
+    def _loss_and_weights(self, y_pred, y_true):
+        loss, weights = super(SquaredEpsilonInsensitive, self)._loss_and_weights(y_pred, y_true)
+        return np.square(loss), 2 * loss * weights
 
-    def step_size(self, X_batch, y_batch):
-        if np.array_equal(X_batch, self.X):  # no mini batches
-            if not hasattr(self, '_step_size'):
-                mu = 1
-                n_samples = self.X.shape[0]
-                L = (1 / n_samples * mu +  # Lipschitz constant wrt the regularization term (strictly convex)
-                     self.svm.C / n_samples * np.linalg.norm(self.X) ** 2)  # Lipschitz constant wrt the loss term
-                self._step_size = 1 / L
-            yield self._step_size
-        else:
-            mu = 1
-            n_samples = X_batch.shape[0]
-            L = (1 / n_samples * mu +  # Lipschitz constant wrt the regularization term (strictly convex)
-                 self.svm.C / n_samples * np.linalg.norm(X_batch) ** 2)  # Lipschitz constant wrt the loss term
-            yield 1 / L
+    def lipschitz_constant(self, X_batch):
+        mu = 1
+        n_samples = X_batch.shape[0]
+        return (1 / n_samples * mu +  # Lipschitz constant wrt the regularization term (strictly convex)
+                self.svm.C / n_samples * self.squared_norm(X_batch))  # Lipschitz constant wrt the loss term
 
 
 hinge = Hinge
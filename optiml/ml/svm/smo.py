@@ -10,7 +10,7 @@ from .kernels import LinearKernel
 
 class SMO(ABC):
 
-    def __init__(self, quad, X, y, K, kernel, C, tol=1e-3, verbose=False):
+    def __init__(self, quad, X, y, K, kernel, C, tol=1e-3, verbose=False, shrinking=False):
         self.quad = quad
         self.X = X
         self.y = y
@@ -24,6 +24,28 @@ class SMO(ABC):
         self.tol = tol
         self.iter = 0
         self.verbose = verbose
+        self.shrinking = shrinking
+        # {i : i has not been shrunk}, i.e., the indices still examined
+        self.active = np.full(len(X), True)
+        # number of consecutive sweeps in which each index has been found optimal at the bounds
+        self._n_optimal = np.zeros(len(X), dtype=int)
+
+    def _is_free(self, i):
+        raise NotImplementedError
+
+    def _shrink(self, i, changed):
+        # shrink the variable if it stays stuck at the bounds, i.e., it
+        # satisfies the KKT conditions, for two consecutive sweeps
+        if changed or self._is_free(i):
+            self._n_optimal[i] = 0
+        else:
+            self._n_optimal[i] += 1
+            if self._n_optimal[i] >= 2:
+                self.active[i] = False
+
+    def _unshrink(self):
+        self.active[:] = True
+        self._n_optimal[:] = 0
 
     def _take_step(self, i1, i2):
         raise NotImplementedError
@@ -57,9 +79,9 @@ class SMOClassifier(SMO):
     Algorithm for SVM Classifier Design. Technical Report CD-99-14.
     """
 
-    def __init__(self, quad, X, y, K, kernel, C, tol=1e-3, verbose=False):
+    def __init__(self, quad, X, y, K, kernel, C, tol=1e-3, verbose=False, shrinking=False):
         self.alphas = np.zeros(len(X))
-        super(SMOClassifier, self).__init__(quad, X, y, K, kernel, C, tol, verbose)
+        super(SMOClassifier, self).__init__(quad, X, y, K, kernel, C, tol, verbose, shrinking)
 
         # initialize variables and structures to implement improvements
         # on the original Platt's SMO algorithm described in Keerthi et
@@ -236,6 +258,9 @@ class SMOClassifier(SMO):
 
         return True
 
+    def _is_free(self, i):
+        return i in self.I0
+
     def _examine_example(self, i2):
         if i2 in self.I0:
             E2 = self.errors[i2]
@@ -289,8 +314,12 @@ class SMOClassifier(SMO):
             num_changed = 0
             # loop over all training examples
             if examine_all:
-                for i in range(len(self.X)):
-                    num_changed += self._examine_example(i)
+                examined_all = self.active.all()
+                for i in np.flatnonzero(self.active):
+                    changed = self._examine_example(i)
+                    num_changed += changed
+                    if self.shrinking:
+                        self._shrink(i, changed)
             else:
                 # loop over examples where alphas are not already at their limits
                 for i in range(len(self.X)):
@@ -302,11 +331,19 @@ class SMOClassifier(SMO):
                             break
             if examine_all:
                 examine_all = False
+                # before stopping, unshrink and check the optimality
+                # over all the training examples with a last full sweep
+                if num_changed == 0 and not examined_all:
+                    self._unshrink()
+                    examine_all = True
             elif num_changed == 0:
                 examine_all = True
 
             if self.verbose and not self.iter % self.verbose:
-                print('{:4d}\t{: 1.4e}'.format(self.iter, self.quad.function(self.alphas)))
+                if self.quad is not None:
+                    print('{:4d}\t{: 1.4e}'.format(self.iter, self.quad.function(self.alphas)))
+                else:  # the kernel matrix is not available, e.g., the kernel is cached
+                    print('{:4d}'.format(self.iter))
 
             self.iter += 1
 
@@ -318,6 +355,257 @@ class SMOClassifier(SMO):
         return self
 
 
+class SecondOrderSMOClassifier(SMO):
+    """
+    Implements the sequential minimal optimization algorithm for training
+    a support vector classifier with the second order working set selection
+    by Fan et al., i.e., the WSS2 strategy used by LIBSVM.
+
+    Differently from `SMOClassifier`, which examines one index at a time
+    following the Keerthi et al. heuristics, this class keeps the gradient
+    of the dual objective as an array and, at each iteration, selects the
+    working pair (i, j) with vectorized operations over boolean masks: i is
+    the maximal violating index, while j is the index that gives the largest
+    decrease of the objective function, according to its second order
+    approximation, once paired with i. Then, each iteration just costs two
+    kernel columns plus O(n) NumPy work.
+
+    References
+    ----------
+
+    R.E. Fan, P.H. Chen, C.J. Lin. Working Set Selection Using Second Order Information
+    for Training Support Vector Machines. Journal of Machine Learning Research 6, 2005.
+
+    C.C. Chang, C.J. Lin. LIBSVM: A Library for Support Vector Machines.
+    ACM Transactions on Intelligent Systems and Technology, 2011.
+    """
+
+    def __init__(self, quad, X, y, K, kernel, C, tol=1e-3, verbose=False, shrinking=False):
+        self.alphas = np.zeros(len(X))
+        super(SecondOrderSMOClassifier, self).__init__(quad, X, y, K, kernel, C, tol, verbose, shrinking)
+        self.y = np.asarray(y, dtype=float)
+        self.K_diag = K.diagonal()
+        # gradient of the dual objective 1/2 alphas^T Q alphas - e^T alphas,
+        # where Q = K * y y^T, at alphas = 0, i.e., G = Q alphas - e
+        self.grad = -np.ones(len(X))
+        if self.shrinking:
+            # the part of the gradient due to the alphas at the upper bound,
+            # i.e., G_bar = C sum_{j : alphas[j] = C} Q[:, j], needed to
+            # reconstruct the gradient of the shrunk variables
+            self.grad_bar = np.zeros(len(X))
+            self._unshrunk = False
+        # indices of the active variables or None if no variable has been shrunk
+        self._active_idx = None
+
+    def _active(self):
+        return self._active_idx if self._active_idx is not None else slice(None)
+
+    def _select_working_set(self):
+        """
+        Returns the working pair (i, j) or (-1, -1) if the current
+        alphas are optimal within the tolerance.
+        """
+        A = self._active()
+        y, alphas = self.y[A], self.alphas[A]
+        yG = -y * self.grad[A]
+
+        # {t : alphas[t] < C, y[t] = +1 or alphas[t] > 0, y[t] = -1}
+        I_up = np.logical_or(np.logical_and(y > 0, alphas < self.C),
+                             np.logical_and(y < 0, alphas > 0))
+        # {t : alphas[t] < C, y[t] = -1 or alphas[t] > 0, y[t] = +1}
+        I_low = np.logical_or(np.logical_and(y < 0, alphas < self.C),
+                              np.logical_and(y > 0, alphas > 0))
+
+        if not I_up.any() or not I_low.any():
+            return -1, -1
+
+        # select i as the maximal violating index in I_up
+        i = np.argmax(np.where(I_up, yG, -np.inf))
+        G_max = yG[i]
+        G_min = np.min(yG[I_low])
+
+        if G_max - G_min < 2 * self.tol:
+            return -1, -1
+
+        if self._active_idx is not None:
+            i_global = self._active_idx[i]
+        else:
+            i_global = i
+
+        # select j in I_low by the second order information
+        Ki = self.K[i_global][A]
+        b = G_max - yG
+        a = self.K_diag[i_global] + self.K_diag[A] - 2 * Ki
+        a[a <= 0] = 1e-12  # tau
+        candidates = np.logical_and(I_low, b > 0)
+        j = np.argmin(np.where(candidates, -(b * b) / a, np.inf))
+
+        if self._active_idx is not None:
+            return i_global, self._active_idx[j]
+        return i_global, j
+
+    def _take_step(self, i, j):
+        y, alphas = self.y, self.alphas
+        alpha_i, alpha_j = alphas[i], alphas[j]
+
+        eta = self.K_diag[i] + self.K_diag[j] - 2 * self.K[i, j]
+        if eta <= 0:
+            eta = 1e-12  # tau
+            warnings.warn('kernel matrix is not positive definite', PositiveSpectrumWarning)
+
+        # solve the two variables sub-problem analytically
+        # and clip the new alphas inside the feasible box
+        if y[i] != y[j]:
+            delta = (-self.grad[i] - self.grad[j]) / eta
+            diff = alpha_i - alpha_j
+            a_i, a_j = alpha_i + delta, alpha_j + delta
+            if diff > 0:
+                if a_j < 0:
+                    a_j, a_i = 0., diff
+            elif a_i < 0:
+                a_i, a_j = 0., -diff
+            if diff > 0:
+                if a_i > self.C:
+                    a_i, a_j = self.C, self.C - diff
+            elif a_j > self.C:
+                a_j, a_i = self.C, self.C + diff
+        else:
+            delta = (self.grad[i] - self.grad[j]) / eta
+            total = alpha_i + alpha_j
+            a_i, a_j = alpha_i - delta, alpha_j + delta
+            if total > self.C:
+                if a_i > self.C:
+                    a_i, a_j = self.C, total - self.C
+            elif a_j < 0:
+                a_j, a_i = 0., total
+            if total > self.C:
+                if a_j > self.C:
+                    a_j, a_i = self.C, total - self.C
+            elif a_i < 0:
+                a_i, a_j = 0., total
+
+        # update the gradient of the active variables with a single rank-2
+        # update, i.e., G += Q[:, i] * delta_alpha_i + Q[:, j] * delta_alpha_j
+        A = self._active()
+        Ki, Kj = self.K[i], self.K[j]
+        self.grad[A] += y[A] * (y[i] * (a_i - alpha_i) * Ki[A] +
+                                y[j] * (a_j - alpha_j) * Kj[A])
+
+        if self.shrinking:
+            # update G_bar if some variable entered or left the upper bound
+            for t, Kt, alpha_t, a_t in ((i, Ki, alpha_i, a_i), (j, Kj, alpha_j, a_j)):
+                if (alpha_t >= self.C) != (a_t >= self.C):
+                    self.grad_bar += (self.C if a_t >= self.C else -self.C) * y * y[t] * Kt
+
+        alphas[i], alphas[j] = a_i, a_j
+
+    def _reconstruct_gradient(self):
+        if self._active_idx is None:
+            return
+        y, alphas = self.y, self.alphas
+        inactive = np.flatnonzero(np.logical_not(self.active))
+        self.grad[inactive] = self.grad_bar[inactive] - 1
+        for i in np.flatnonzero(np.logical_and(alphas > 0, alphas < self.C)):
+            self.grad[inactive] += alphas[i] * y[i] * y[inactive] * self.K[i][inactive]
+        self._unshrink()
+
+    def _unshrink(self):
+        super(SecondOrderSMOClassifier, self)._unshrink()
+        self._active_idx = None
+
+    def _do_shrinking(self):
+        A = self._active()
+        y, alphas, grad = self.y[A], self.alphas[A], self.grad[A]
+        yG = -y * grad
+
+        I_up = np.logical_or(np.logical_and(y > 0, alphas < self.C),
+                             np.logical_and(y < 0, alphas > 0))
+        I_low = np.logical_or(np.logical_and(y < 0, alphas < self.C),
+                              np.logical_and(y > 0, alphas > 0))
+
+        G_max1 = yG[I_up].max() if I_up.any() else -np.inf  # max { -y_i * G_i | i in I_up }
+        G_max2 = -yG[I_low].min() if I_low.any() else -np.inf  # max { y_i * G_i | i in I_low }
+
+        # when close to the optimum, reconstruct the gradient and
+        # unshrink once since the previous shrinking may be wrong
+        if not self._unshrunk and G_max1 + G_max2 <= 10 * 2 * self.tol:
+            self._unshrunk = True
+            self._reconstruct_gradient()
+            A = self._active()
+            y, alphas, grad = self.y[A], self.alphas[A], self.grad[A]
+
+        # shrink the bounded variables that cannot
+        # be selected in the working set anymore
+        at_ub, at_lb = alphas >= self.C, alphas <= 0
+        shrunk = np.logical_or.reduce((np.logical_and(at_ub, np.where(y > 0, -grad > G_max1, -grad > G_max2)),
+                                       np.logical_and(at_lb, np.where(y > 0, grad > G_max2, grad > G_max1))))
+
+        if shrunk.any():
+            self.active[np.arange(len(self.X))[A][shrunk]] = False
+            self._active_idx = np.flatnonzero(self.active)
+
+    def _compute_b(self):
+        y, alphas = self.y, self.alphas
+        yG = y * self.grad
+
+        free = np.logical_and(alphas > 0, alphas < self.C)
+        if free.any():
+            rho = np.mean(yG[free])
+        else:
+            at_ub = alphas >= self.C
+            ub = np.logical_or(np.logical_and(at_ub, y < 0), np.logical_and(~at_ub, y > 0))
+            lb = np.logical_or(np.logical_and(at_ub, y > 0), np.logical_and(~at_ub, y < 0))
+            rho = ((yG[ub].min() if ub.any() else np.inf) +
+                   (yG[lb].max() if lb.any() else -np.inf)) / 2
+
+        return -rho
+
+    def minimize(self):
+        if self.verbose:
+            print('iter\t cost')
+
+        counter = min(len(self.X), 1000) + 1
+
+        while True:
+
+            # shrink the problem every min(n_samples, 1000) iterations
+            counter -= 1
+            if counter == 0:
+                counter = min(len(self.X), 1000)
+                if self.shrinking:
+                    self._do_shrinking()
+
+            i, j = self._select_working_set()
+            if i == -1:
+                if self._active_idx is None:
+                    break
+                # reconstruct the whole gradient and check
+                # the optimality over all the variables
+                self._reconstruct_gradient()
+                i, j = self._select_working_set()
+                if i == -1:
+                    break
+                counter = 1  # shrink at the next iteration
+
+            self._take_step(i, j)
+
+            if self.verbose and not self.iter % self.verbose:
+                # since G = Q alphas - e, the objective is just 1/2 alphas^T (G - e)
+                # which is exact only if no variable has been shrunk
+                print('{:4d}\t{: 1.4e}'.format(self.iter, 0.5 * self.alphas.dot(self.grad - 1)))
+
+            self.iter += 1
+
+        self.b = self._compute_b()
+        if isinstance(self.kernel, LinearKernel):
+            self.w = np.dot(self.alphas * self.y, self.X)
+
+        if self.verbose:
+            print()
+
+        return self
+
+
 class SMORegression(SMO):
     """
     Implements Smola and Scholkopf sequential minimal optimization
@@ -344,25 +632,22 @@ class SMORegression(SMO):
     Algorithm for SVM Regression. Technical Report CD-99-16.
     """
 
-    def __init__(self, quad, X, y, K, kernel, C, epsilon, tol=1e-3, verbose=False):
+    def __init__(self, quad, X, y, K, kernel, C, epsilon, tol=1e-3, verbose=False, shrinking=False):
         self.alphas_p = np.zeros(len(X))
         self.alphas_n = np.zeros(len(X))
-        super(SMORegression, self).__init__(quad, X, y, K, kernel, C, tol, verbose)
+        super(SMORegression, self).__init__(quad, X, y, K, kernel, C, tol, verbose, shrinking)
         self.epsilon = epsilon
 
         # initialize variables and structures to implement improvements
         # on the original Smola and Scholkopf SMO algorithm described in
         # Shevade et al. for better performance ed efficiency
 
-        # set of indices
-        # {i : 0 < alphas_p[i] < C, 0 < alphas_n[i] < C}
-        self.I0 = set()
-        # {i : alphas_p[i] = 0, alphas_n[i] = 0}
-        self.I1 = set(range(len(X)))
-        # {i : alphas_p[i] = 0, alphas_n[i] = C}
-        self.I2 = set()
-        # {i : alphas_p[i] = C, alphas_n[i] = 0}
-        self.I3 = set()
+        # status of each index, i.e., k such that i is in the set Ik:
+        # I0 = {i : 0 < alphas_p[i] < C, 0 < alphas_n[i] < C}
+        # I1 = {i : alphas_p[i] = 0, alphas_n[i] = 0}
+        # I2 = {i : alphas_p[i] = 0, alphas_n[i] = C}
+        # I3 = {i : alphas_p[i] = C, alphas_n[i] = 0}
+        self.status = np.full(len(X), 1, dtype=np.int8)
 
         # multiple thresholds
         self.b_up_idx = 0
@@ -496,23 +781,20 @@ class SMORegression(SMO):
         if not changed:
             return False
 
+        delta1 = (self.alphas_p[i1] - self.alphas_n[i1]) - (alpha1_p - alpha1_n)
+        delta2 = (self.alphas_p[i2] - self.alphas_n[i2]) - (alpha2_p - alpha2_n)
+
         # if kernel is liner update weight vector
         # to reflect change in a1 and a2
         if isinstance(self.kernel, LinearKernel):
-            self.w -= (((self.alphas_p[i1] - self.alphas_n[i1]) - (alpha1_p - alpha1_n)) * self.X[i1] +
-                       ((self.alphas_p[i2] - self.alphas_n[i2]) - (alpha2_p - alpha2_n)) * self.X[i2])
+            self.w -= delta1 * self.X[i1] + delta2 * self.X[i2]
 
-        # update error cache using new alphas
-        for i in self.I0:
-            if i != i1 and i != i2:
-                self.errors[i] += (
-                        ((self.alphas_p[i1] - self.alphas_n[i1]) - (alpha1_p - alpha1_n)) * self.K[i1, i] +
-                        ((self.alphas_p[i2] - self.alphas_n[i2]) - (alpha2_p - alpha2_n)) * self.K[i2, i])
-        # update error cache using new alphas for i1 and i2
-        self.errors[i1] += (((self.alphas_p[i1] - self.alphas_n[i1]) - (alpha1_p - alpha1_n)) * self.K[i1, i1] +
-                            ((self.alphas_p[i2] - self.alphas_n[i2]) - (alpha2_p - alpha2_n)) * self.K[i1, i2])
-        self.errors[i2] += (((self.alphas_p[i1] - self.alphas_n[i1]) - (alpha1_p - alpha1_n)) * self.K[i1, i2] +
-                            ((self.alphas_p[i2] - self.alphas_n[i2]) - (alpha2_p - alpha2_n)) * self.K[i2, i2])
+        # update error cache over I0, i1 and i2 using new alphas
+        # with a rank-2 update from the i1-th and i2-th kernel columns
+        mask = self.status == 0
+        mask[[i1, i2]] = True
+        idx = np.flatnonzero(mask)
+        self.errors[idx] += delta1 * self.K[i1][idx] + delta2 * self.K[i2][idx]
 
         # to prevent precision problems
         if alpha1_p > self.C - 1e-10 * self.C:
@@ -539,87 +821,82 @@ class SMORegression(SMO):
         self.alphas_p[i1], self.alphas_p[i2] = alpha1_p, alpha2_p
         self.alphas_n[i1], self.alphas_n[i2] = alpha1_n, alpha2_n
 
-        # update the sets of indices for i1 and i2
+        # update the status of i1 and i2
         for i in (i1, i2):
-            if 0 < self.alphas_p[i] < self.C or 0 < self.alphas_n[i] < self.C:
-                self.I0.add(i)
-            else:
-                self.I0.discard(i)
-            if self.alphas_p[i] == 0 and self.alphas_n[i] == 0:
-                self.I1.add(i)
-            else:
-                self.I1.discard(i)
-            if self.alphas_p[i] == 0 and self.alphas_n[i] == self.C:
-                self.I2.add(i)
-            else:
-                self.I2.discard(i)
-            if self.alphas_p[i] == self.C and self.alphas_n[i] == 0:
-                self.I3.add(i)
-            else:
-                self.I3.discard(i)
-
-        # update thresholds
-        self.b_up_idx = -1
-        self.b_low_idx = -1
-        self.b_up = sys.float_info.max
-        self.b_low = -sys.float_info.max
+            self.status[i] = self._status(self.alphas_p[i], self.alphas_n[i])
+
+        # update thresholds over I0, where the error of each index
+        # is shifted by -epsilon if alphas_p is free, +epsilon otherwise
+        free = np.flatnonzero(self.status == 0)
+        if free.size:
+            shifted_errors = self.errors[free] + np.where(
+                (self.alphas_p[free] > 0) & (self.alphas_p[free] < self.C), -self.epsilon, self.epsilon)
+            low, up = np.argmax(shifted_errors), np.argmin(shifted_errors)
+            self.b_low, self.b_low_idx = shifted_errors[low], free[low]
+            self.b_up, self.b_up_idx = shifted_errors[up], free[up]
+        else:
+            self.b_up_idx = -1
+            self.b_low_idx = -1
+            self.b_up = sys.float_info.max
+            self.b_low = -sys.float_info.max
 
-        for i in self.I0:
-            if 0 < self.alphas_p[i] < self.C and self.errors[i] - self.epsilon > self.b_low:
-                self.b_low = self.errors[i] - self.epsilon
+        for i in (i1, i2):
+            status, error = self.status[i], self.errors[i]
+            if status == 2 and error + self.epsilon > self.b_low:
+                self.b_low = error + self.epsilon
                 self.b_low_idx = i
-            elif 0 < self.alphas_n[i] < self.C and self.errors[i] + self.epsilon > self.b_low:
-                self.b_low = self.errors[i] + self.epsilon
+            elif status == 1 and error - self.epsilon > self.b_low:
+                self.b_low = error - self.epsilon
                 self.b_low_idx = i
 
-            if 0 < self.alphas_p[i] < self.C and self.errors[i] - self.epsilon < self.b_up:
-                self.b_up = self.errors[i] - self.epsilon
+            if status == 3 and error - self.epsilon < self.b_up:
+                self.b_up = error - self.epsilon
                 self.b_up_idx = i
-            elif 0 < self.alphas_n[i] < self.C and self.errors[i] + self.epsilon < self.b_up:
+            elif status == 1 and error + self.epsilon < self.b_up:
                 self.b_up = self.errors[i] + self.epsilon
                 self.b_up_idx = i
 
-        for i in (i1, i2):
-            if i not in self.I0:
-                if i in self.I2 and self.errors[i] + self.epsilon > self.b_low:
-                    self.b_low = self.errors[i] + self.epsilon
-                    self.b_low_idx = i
-                elif i in self.I1 and self.errors[i] - self.epsilon > self.b_low:
-                    self.b_low = self.errors[i] - self.epsilon
-                    self.b_low_idx = i
-
-                if i in self.I3 and self.errors[i] - self.epsilon < self.b_up:
-                    self.b_up = self.errors[i] - self.epsilon
-                    self.b_up_idx = i
-                elif i in self.I1 and self.errors[i] + self.epsilon < self.b_up:
-                    self.b_up = self.errors[i] + self.epsilon
-                    self.b_up_idx = i
-
         if self.b_low_idx == -1 or self.b_up_idx == -1:
             raise Exception('unexpected status')
 
         return True
 
+    def _status(self, alpha_p, alpha_n):
+        if 0 < alpha_p < self.C or 0 < alpha_n < self.C:
+            return 0
+        if alpha_p == 0 and alpha_n == 0:
+            return 1
+        if alpha_p == 0 and alpha_n == self.C:
+            return 2
+        if alpha_p == self.C and alpha_n == 0:
+            return 3
+        return -1
+
+    def _is_free(self, i):
+        return self.status[i] == 0
+
     def _examine_example(self, i2):
         alpha2_p, alpha2_n = self.alphas_p[i2], self.alphas_n[i2]
 
-        if i2 in self.I0:
+        status2 = self.status[i2]
+
+        if status2 == 0:
             E2 = self.errors[i2]
         else:
             E2 = self.y[i2] - (self.alphas_p - self.alphas_n).dot(self.K[i2])
             self.errors[i2] = E2
             # update (b_low, b_low_idx) or (b_up, b_up_idx) using (E2, i2)
-            if i2 in self.I1:
+            if status2 == 1:
                 if E2 + self.epsilon < self.b_up:
                     self.b_up = E2 + self.epsilon
                     self.b_up_idx = i2
                 elif E2 - self.epsilon > self.b_low:
                     self.b_low = E2 - self.epsilon
                     self.b_low_idx = i2
-            elif i2 in self.I2 and E2 + self.epsilon > self.b_low:
+            elif status2 == 2 and E2 + self.epsilon > self.b_low:
                 self.b_low = E2 + self.epsilon
                 self.b_low_idx = i2
-            elif i2 in self.I3 and E2 - self.epsilon < self.b_up:
+            elif status2 == 3 and E2 - self.epsilon < self.b_up:
                 self.b_up = E2 - self.epsilon
                 self.b_up_idx = i2
 
@@ -627,7 +904,7 @@ class SMORegression(SMO):
         # find another index i1 to do joint optimization with i2
         i1 = -1
         optimal = True
-        if i2 in self.I0:
+        if status2 == 0:
             if 0 < alpha2_p < self.C:
                 if self.b_low - (E2 - self.epsilon) > 2 * self.tol:
                     optimal = False
@@ -654,7 +931,7 @@ class SMORegression(SMO):
                     # for i2 in I0 choose the better i1
                     if self.b_low - (E2 + self.epsilon) > (E2 + self.epsilon) - self.b_up:
                         i1 = self.b_low_idx
-        elif i2 in self.I1:
+        elif status2 == 1:
             if self.b_low - (E2 + self.epsilon) > 2 * self.tol:
                 optimal = False
                 i1 = self.b_low_idx
@@ -667,11 +944,11 @@ class SMORegression(SMO):
                 # for i2 in I1 choose the better i1
                 if self.b_low - (E2 - self.epsilon) > (E2 - self.epsilon) - self.b_up:
                     i1 = self.b_low_idx
-        elif i2 in self.I2:
+        elif status2 == 2:
             if (E2 + self.epsilon) - self.b_up > 2 * self.tol:
                 optimal = False
                 i1 = self.b_up_idx
-        elif i2 in self.I3:
+        elif status2 == 3:
             if self.b_low - (E2 - self.epsilon) > 2 * self.tol:
                 optimal = False
                 i1 = self.b_low_idx
@@ -693,25 +970,44 @@ class SMORegression(SMO):
             num_changed = 0
             # loop over all training examples
             if examine_all:
-                for i in range(len(self.X)):
-                    num_changed += self._examine_example(i)
+                examined_all = self.active.all()
+                for i in np.flatnonzero(self.active):
+                    changed = self._examine_example(i)
+                    num_changed += changed
+                    if self.shrinking:
+                        self._shrink(i, changed)
             else:
                 # loop over examples where alphas are not already at their limits
-                for i in range(len(self.X)):
-                    if 0 < self.alphas_p[i] < self.C or 0 < self.alphas_n[i] < self.C:
-                        num_changed += self._examine_example(i)
-                        # check if optimality on I0 is attained
-                        if self.b_up > self.b_low - 2 * self.tol:
-                            num_changed = 0
-                            break
+                i = 0
+                while True:
+                    # look for the next index in I0, the status of the
+                    # indices are updated by each successful step
+                    free = np.flatnonzero(self.status[i:] == 0)
+                    if not free.size:
+                        break
+                    i += free[0]
+                    num_changed += self._examine_example(i)
+                    # check if optimality on I0 is attained
+                    if self.b_up > self.b_low - 2 * self.tol:
+                        num_changed = 0
+                        break
+                    i += 1
             if examine_all:
                 examine_all = False
+                # before stopping, unshrink and check the optimality
+                # over all the training examples with a last full sweep
+                if num_changed == 0 and not examined_all:
+                    self._unshrink()
+                    examine_all = True
             elif num_changed == 0:
                 examine_all = True
 
             if self.verbose and not self.iter % self.verbose:
-                print('{:4d}\t{: 1.4e}'.format(
-                    self.iter, self.quad.function(np.concatenate((self.alphas_p, self.alphas_n)))))
+                if self.quad is not None:
+                    print('{:4d}\t{: 1.4e}'.format(
+                        self.iter, self.quad.function(np.concatenate((self.alphas_p, self.alphas_n)))))
+                else:  # the kernel matrix is not available, e.g., the kernel is cached
+                    print('{:4d}'.format(self.iter))
 
             self.iter += 1
 
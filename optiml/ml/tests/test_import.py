@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def test_import_svm_without_heavy_dependencies():
+    # the heavy dependencies needed only by few solvers, i.e., the external
+    # QP solvers and cvxpy, are imported lazily, so after importing the SVMs
+    # they are either missing from sys.modules or just bound to a lazy module
+    # which has not been executed yet, i.e., which is not a plain module
+    code = ('import sys, types\n'
+            'import optiml.ml.svm\n'
+            'print(any(type(sys.modules.get(module)) is types.ModuleType\n'
+            '          for module in ("cvxpy", "qpsolvers", "wurlitzer")))\n')
+    eagerly_imported = subprocess.check_output([sys.executable, '-c', code], text=True).strip()
+    assert eagerly_imported == 'False'
+
+
+if __name__ == "__main__":
+    pytest.main()
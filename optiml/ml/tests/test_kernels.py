@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.preprocessing import MinMaxScaler
+
+from optiml.ml.svm.kernels import linear, poly, gaussian, laplacian, sigmoid, precomputed, SignedKernelMatrix
+
+
+def test_gram_by_row_tiles():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    for kernel in (linear, poly, gaussian, laplacian, sigmoid):
+        assert np.allclose(kernel.gram(X_scaled, batch_size=16), kernel(X_scaled))
+        assert np.allclose(kernel.gram(X_scaled, X_scaled[:10], batch_size=16), kernel(X_scaled, X_scaled[:10]))
+        out = np.empty((len(X_scaled), len(X_scaled)), dtype=np.float32)
+        assert kernel.gram(X_scaled, batch_size=16, out=out) is out
+        assert np.allclose(out, kernel(X_scaled), atol=1e-6)
+
+
+def test_bound_kernel():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    for kernel in (linear, poly, gaussian, laplacian, sigmoid):
+        bound_kernel = kernel.bind(X_scaled, X_scaled[:10])
+        # gamma is resolved wrt X even when the kernel is evaluated on a subset of it
+        assert np.allclose(bound_kernel(X_scaled[20:30], X_scaled[:10]), kernel(X_scaled)[20:30, :10])
+        assert np.allclose(bound_kernel(X_scaled[20:30], X_scaled[40:50]), kernel(X_scaled)[20:30, 40:50])
+
+
+def test_precomputed_kernel(tmp_path):
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    K = np.memmap(tmp_path / 'K.dat', dtype=np.float64, mode='w+', shape=(len(X_scaled), len(X_scaled)))
+    K[:] = gaussian(X_scaled)
+    # the kernel matrix is just validated, not copied
+    assert np.shares_memory(precomputed.gram(K), K)
+    assert np.allclose(precomputed.diag(K), 1.)
+    bound_kernel = precomputed.bind(K, np.arange(10))
+    assert np.allclose(bound_kernel(K[20:30], np.arange(10)), K[20:30, :10])
+    with pytest.raises(ValueError):
+        bound_kernel(K[20:30, :100], np.arange(10))
+    with pytest.raises(ValueError):
+        precomputed.gram(K[:, :100])
+
+
+def test_signed_kernel_matrix():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    K = gaussian(X_scaled)
+    y = np.where(y == 0, 1., -1.)
+    e = np.hstack((np.ones(len(y)), -np.ones(len(y))))
+    # the Hessians of the SVC and SVR duals with the regularized intercept and the squared losses
+    for signs, Q in ((y, K * np.outer(y, y) + np.outer(y, y) + np.eye(len(y)) / 2),
+                     (e, np.block([[K, -K], [-K, K]]) + np.outer(e, e) + np.eye(2 * len(y)) / 2)):
+        signed_K = SignedKernelMatrix(K, signs, intercept=1., diagonal=0.5)
+        assert np.allclose(np.array(signed_K), Q)
+        x = np.random.RandomState(123456).uniform(size=(len(signs), 3))
+        assert np.allclose(signed_K.dot(x[:, 0]), Q.dot(x[:, 0]))
+        assert np.allclose(signed_K.dot(x), Q.dot(x))
+        assert np.allclose(signed_K[np.ix_([1, 100, 3], [4, 120])], Q[np.ix_([1, 100, 3], [4, 120])])
+        assert np.allclose(signed_K[[1, 100], 3], Q[[1, 100], 3])
+        assert np.isclose(signed_K[100, 100], Q[100, 100])
+    with pytest.raises(ValueError):
+        SignedKernelMatrix(K, y[:100])
+
+
+if __name__ == "__main__":
+    pytest.main()
@@ -1,14 +1,16 @@
 import numpy as np
 import pytest
-from sklearn.datasets import load_iris
+from scipy.sparse import csr_matrix
+from sklearn.datasets import load_iris, load_breast_cancer, make_circles
 from sklearn.model_selection import train_test_split
 from sklearn.multiclass import OneVsRestClassifier as OVR
 from sklearn.preprocessing import MinMaxScaler
 
 from optiml.ml.svm import SVC
-from optiml.ml.svm.kernels import gaussian
+from optiml.ml.svm.kernels import gaussian, laplacian, precomputed, RandomFourierFeatures, Nystroem
 from optiml.ml.svm.losses import hinge, squared_hinge
-from optiml.opti.constrained import ProjectedGradient, ActiveSet, InteriorPoint, FrankWolfe
+from optiml.ml.svm.smo import SecondOrderSMOClassifier, SMORegression
+from optiml.opti.constrained import ProjectedGradient, SpectralProjectedGradient, ActiveSet, InteriorPoint, FrankWolfe
 from optiml.opti.unconstrained import ProximalBundle
 from optiml.opti.unconstrained.line_search import SteepestGradientDescent, ConjugateGradient, Newton, BFGS
 from optiml.opti.unconstrained.stochastic import (StochasticGradientDescent, Adam, AMSGrad,
@@ -104,6 +106,65 @@ def test_solve_primal_l1_svc_with_proximal_bundle():
     assert svc.score(X_test, y_test) >= 0.57
 
 
+def test_solve_primal_l1_svc_with_auto_learning_rate():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+
+    svc = OVR(SVC(loss=hinge, optimizer=StochasticGradientDescent, learning_rate='auto',
+                  batch_size=20, max_iter=100, random_state=123456))
+    svc = svc.fit(X_train, y_train)
+    for estimator in svc.estimators_:
+        # the step size is computed once for each mini batch
+        assert len(estimator.loss._step_sizes) == estimator.optimizer.n_batches
+    assert svc.score(X_test, y_test) >= 0.57
+
+
+def test_solve_primal_l1_svc_with_sparse_input():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+
+    for optimizer, params in ((ConjugateGradient, {}),
+                              (Adam, {'batch_size': 20, 'validation_split': 0.1, 'max_iter': 100})):
+        dense_svc = OVR(SVC(loss=hinge, optimizer=optimizer, random_state=123456, **params))
+        dense_svc = dense_svc.fit(X_train, y_train)
+        sparse_svc = OVR(SVC(loss=hinge, optimizer=optimizer, random_state=123456, **params))
+        sparse_svc = sparse_svc.fit(csr_matrix(X_train), y_train)
+        for dense_estimator, sparse_estimator in zip(dense_svc.estimators_, sparse_svc.estimators_):
+            assert np.allclose(sparse_estimator.coef_, dense_estimator.coef_)
+            assert np.allclose(sparse_estimator.intercept_, dense_estimator.intercept_)
+        assert sparse_svc.score(csr_matrix(X_test), y_test) == dense_svc.score(X_test, y_test)
+
+
+def test_solve_primal_l2_svc_with_kernel_approximations():
+    X, y = make_circles(n_samples=1000, noise=0.1, factor=0.5, random_state=123456)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, train_size=0.75, random_state=123456)
+    for kernel in (RandomFourierFeatures(gaussian, n_components=200, random_state=123456),
+                   RandomFourierFeatures(laplacian, n_components=200, random_state=123456),
+                   Nystroem(gaussian, n_components=100, random_state=123456)):
+        svc = SVC(loss=squared_hinge, kernel=kernel, dual=False, optimizer=Adam,
+                  learning_rate=0.01, max_iter=200, random_state=123456)
+        svc.fit(X_train, y_train)
+        assert svc.score(X_test, y_test) >= 0.97
+        # the support vectors are the input samples, not their approximate feature map
+        assert np.array_equal(svc.support_vectors_, X_train[svc.support_])
+
+
+def test_primal_svc_loss_function_jacobian():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    y = np.where(y == 0, 1., -1.)
+    for loss in (hinge, squared_hinge):
+        svc_loss = loss(SVC(loss=loss, intercept_scaling=2), X_scaled, y)
+        packed_coef_inter = np.random.RandomState(123456).uniform(size=svc_loss.ndim)
+        f_x, g_x = svc_loss.function_jacobian(packed_coef_inter)
+        assert np.isclose(f_x, svc_loss.function(packed_coef_inter))
+        assert np.allclose(g_x, svc_loss.jacobian(packed_coef_inter))
+        assert '_auto_jac' not in vars(svc_loss)  # the autograd closures are built lazily
+        assert np.allclose(g_x, svc_loss.auto_jac(packed_coef_inter))
+
+
 def test_solve_dual_l1_svc_with_smo():
     X, y = load_iris(return_X_y=True)
     X_scaled = MinMaxScaler().fit_transform(X)
@@ -113,6 +174,60 @@ def test_solve_dual_l1_svc_with_smo():
     assert svc.score(X_test, y_test) >= 0.97
 
 
+def test_solve_dual_l1_svc_with_second_order_smo():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+    svc = OVR(SVC(loss=hinge, kernel=gaussian, dual=True, optimizer=SecondOrderSMOClassifier))
+    svc.fit(X_train, y_train)
+    assert svc.score(X_test, y_test) >= 0.97
+
+    with pytest.raises(TypeError):
+        SVC(loss=hinge, kernel=gaussian, dual=True, optimizer=SMORegression).fit(X_train, y_train)
+
+
+def test_solve_dual_l1_svc_with_smo_and_shrinking():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+    for smo in ('smo', SecondOrderSMOClassifier):
+        svc = OVR(SVC(loss=hinge, kernel=gaussian, shrinking=True, dual=True, optimizer=smo))
+        svc.fit(X_train, y_train)
+        assert svc.score(X_test, y_test) >= 0.97
+
+
+def test_solve_dual_l1_svc_with_smo_and_kernel_cache():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+    # a cache small enough to hold just few kernel columns
+    svc = OVR(SVC(loss=hinge, kernel=gaussian, cache_size=0.005, dual=True, optimizer='smo'))
+    svc.fit(X_train, y_train)
+    assert svc.score(X_test, y_test) >= 0.97
+
+
+def test_batched_dual_svc_decision_function():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+    svc = SVC(loss=hinge, kernel=gaussian, dual=True, optimizer='smo')
+    svc.fit(X_train, y_train == 0)
+    decision = svc.decision_function(X_test)
+    assert np.allclose(svc.decision_function(X_test, batch_size=8), decision)
+    assert np.allclose(svc.decision_function(X_test, batch_size=8, n_jobs=2), decision)
+    assert np.array_equal(svc.predict(X_test, batch_size=8, n_jobs=2), svc.predict(X_test))
+
+
+def test_solve_dual_l1_svc_with_newton():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+    # the hessian of the augmented lagrangian is formed explicitly from the kernel matrix
+    svc = OVR(SVC(loss=hinge, kernel=gaussian, reg_intercept=True, dual=True, optimizer=Newton))
+    svc = svc.fit(X_train, y_train)
+    assert svc.score(X_test, y_test) >= 0.89
+
+
 def test_solve_dual_l1_svc_with_cvxopt():
     X, y = load_iris(return_X_y=True)
     X_scaled = MinMaxScaler().fit_transform(X)
@@ -127,6 +242,108 @@ def test_solve_dual_l1_svc_with_cvxopt():
     assert svc.score(X_test, y_test) >= 0.97
 
 
+def test_solve_dual_l1_svc_with_spectral_projected_gradient():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+
+    svc = OVR(SVC(loss=hinge, kernel=gaussian, reg_intercept=False, dual=True, optimizer=SpectralProjectedGradient))
+    svc = svc.fit(X_train, y_train)
+    assert svc.score(X_test, y_test) >= 0.97
+
+
+def test_solve_dual_l1_svc_with_warm_start():
+    X, y = load_breast_cancer(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+
+    svc = SVC(loss=hinge, kernel=gaussian, reg_intercept=True, dual=True,
+              optimizer=ActiveSet, max_iter=5000, warm_start=True)
+    svc = svc.fit(X_train, y_train)
+    assert svc.optimizer.status == 'optimal'
+    cold_iter = svc.optimizer.iter
+
+    # refit starting from the previous alphas
+    svc.C = 1.1
+    svc = svc.fit(X_train, y_train)
+    assert svc.optimizer.status == 'optimal'
+    assert svc.optimizer.iter < cold_iter / 10
+    assert np.isclose(svc.optimizer.f_x, svc.optimizer.f_star())
+    assert svc.score(X_test, y_test) >= 0.95
+
+
+def test_fit_path_dual_l1_svc():
+    X, y = load_breast_cancer(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+
+    Cs = [10, 0.1, 1]
+    svc = SVC(loss=hinge, kernel=gaussian, reg_intercept=True, dual=True, optimizer=ActiveSet, max_iter=5000)
+    models = svc.fit_path(X_train, y_train, Cs)
+    assert [model.C for model in models] == Cs
+    assert svc.C == 10 and not svc.warm_start
+    for C, model in zip(Cs, models):
+        cold = SVC(loss=hinge, kernel=gaussian, reg_intercept=True, dual=True,
+                   optimizer=ActiveSet, max_iter=5000, C=C).fit(X_train, y_train)
+        assert np.allclose(model.alphas_, cold.alphas_)
+        assert np.isclose(model.score(X_test, y_test), cold.score(X_test, y_test))
+
+    with pytest.raises(ValueError):
+        svc.fit_path(X_train, y_train, [1, 0])
+
+
+def test_solve_dual_l1_svc_with_multi_class():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+
+    svc = SVC(loss=hinge, kernel=gaussian, reg_intercept=True, dual=True, optimizer=ActiveSet, multi_class='ovr')
+    svc = svc.fit(X_train, y_train)
+    assert len(svc.estimators_) == 3
+    ovr = OVR(SVC(loss=hinge, kernel=gaussian, reg_intercept=True, dual=True, optimizer=ActiveSet))
+    ovr = ovr.fit(X_train, y_train)
+    assert np.allclose(svc.decision_function(X_test), ovr.decision_function(X_test))
+    assert np.array_equal(svc.predict(X_test), ovr.predict(X_test))
+
+    svc = SVC(loss=hinge, kernel=gaussian, reg_intercept=True, dual=True, optimizer=ActiveSet,
+              multi_class='ovo', n_jobs=2)
+    svc = svc.fit(X_train, y_train)
+    assert len(svc.estimators_) == 3
+    assert svc.decision_function(X_test).shape == (len(X_test), 3)
+    assert svc.score(X_test, y_test) >= 0.97
+
+
+def test_solve_dual_l1_svc_with_precomputed_kernel():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+    kernel = gaussian.bind(X_train)
+    K_train, K_test = kernel(X_train), kernel(X_test, X_train)
+
+    for multi_class in ('ovr', 'ovo'):
+        svc = SVC(loss=hinge, kernel=gaussian, dual=True, optimizer='smo', multi_class=multi_class)
+        svc = svc.fit(X_train, y_train)
+        precomputed_svc = SVC(loss=hinge, kernel=precomputed, dual=True, optimizer='smo', multi_class=multi_class)
+        precomputed_svc = precomputed_svc.fit(K_train, y_train)
+        assert np.allclose(precomputed_svc.decision_function(K_test), svc.decision_function(X_test))
+        assert precomputed_svc.score(K_test, y_test) >= 0.97
+        assert all(estimator.support_vectors_.size == 0 for estimator in precomputed_svc.estimators_)
+
+    with pytest.raises(ValueError):
+        SVC(loss=hinge, kernel=precomputed, dual=False)
+
+
+def test_dual_l1_svc_intercept_from_kkt_conditions():
+    X, y = load_breast_cancer(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+
+    svc = SVC(loss=hinge, kernel=gaussian, dual=True, optimizer='smo', tol=1e-8)
+    svc = svc.fit(X_scaled, y)
+    spg_svc = SVC(loss=hinge, kernel=gaussian, dual=True, optimizer=SpectralProjectedGradient, max_iter=10000)
+    spg_svc = spg_svc.fit(X_scaled, y)
+    assert np.isclose(spg_svc.intercept_, svc.intercept_, atol=1e-4)
+
+
 def test_solve_dual_l1_svc_with_reg_intercept_with_bcqp_optimizers():
     X, y = load_iris(return_X_y=True)
     X_scaled = MinMaxScaler().fit_transform(X)
@@ -273,6 +490,25 @@ def test_solve_dual_l2_svc_with_cvxopt():
     assert svc.score(X_test, y_test) >= 0.97
 
 
+def test_solve_dual_l2_svc_with_bcqp_optimizers():
+    X, y = load_iris(return_X_y=True)
+    X_scaled = MinMaxScaler().fit_transform(X)
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, train_size=0.75, random_state=123456)
+
+    svc = OVR(SVC(loss=squared_hinge, kernel=gaussian, reg_intercept=True, dual=True, optimizer=ActiveSet))
+    svc = svc.fit(X_train, y_train)
+    assert svc.score(X_test, y_test) >= 0.97
+
+    svc = OVR(SVC(loss=squared_hinge, kernel=gaussian, reg_intercept=True, dual=True, optimizer=InteriorPoint))
+    svc = svc.fit(X_train, y_train)
+    assert svc.score(X_test, y_test) >= 0.97
+
+    svc = OVR(SVC(loss=squared_hinge, kernel=gaussian, reg_intercept=False,
+                  dual=True, optimizer=SpectralProjectedGradient))
+    svc = svc.fit(X_train, y_train)
+    assert svc.score(X_test, y_test) >= 0.97
+
+
 def test_solve_dual_l2_svc_with_AdaGrad():
     X, y = load_iris(return_X_y=True)
     X_scaled = MinMaxScaler().fit_transform(X)
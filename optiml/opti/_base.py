@@ -3,7 +3,7 @@ from abc import ABC
 import autograd.numpy as np
 from autograd import jacobian, hessian
 from scipy.linalg import cho_solve, cho_factor
-from scipy.sparse.linalg import minres
+from scipy.sparse.linalg import LinearOperator, minres
 
 
 class Optimizer(ABC):
@@ -46,10 +46,10 @@ class Optimizer(ABC):
                     # and the dual variable, i.e., mu_lmbda, to 0
                     if random_state is None:
                         x = np.concatenate((np.random.uniform(size=f.primal.ndim),  # x
-                                            np.zeros(f.AG.shape[0])))  # mu_lmbda
+                                            np.zeros(f.n_constraints)))  # mu_lmbda
                     else:
                         x = np.concatenate((np.random.RandomState(random_state).uniform(size=f.primal.ndim),  # x
-                                            np.zeros(f.AG.shape[0])))  # mu_lmbda
+                                            np.zeros(f.n_constraints)))  # mu_lmbda
             else:
                 if random_state is None:
                     x = np.random.uniform
@@ -184,10 +184,30 @@ class Optimizer(ABC):
 class OptimizationFunction(ABC):
 
     def __init__(self, ndim=2):
-        self.auto_jac = jacobian(self.function)
-        self.auto_hess = hessian(self.function)
         self.ndim = ndim
 
+    @property
+    def auto_jac(self):
+        # the autograd closures are built lazily on first use, since the
+        # functions which provide their analytic derivatives never need them
+        if not hasattr(self, '_auto_jac'):
+            self._auto_jac = jacobian(self.function)
+        return self._auto_jac
+
+    @auto_jac.setter
+    def auto_jac(self, auto_jac):
+        self._auto_jac = auto_jac
+
+    @property
+    def auto_hess(self):
+        if not hasattr(self, '_auto_hess'):
+            self._auto_hess = hessian(self.function)
+        return self._auto_hess
+
+    @auto_hess.setter
+    def auto_hess(self, auto_hess):
+        self._auto_hess = auto_hess
+
     def x_star(self):
         return np.full(fill_value=np.nan, shape=self.ndim)
 
@@ -233,18 +253,21 @@ class Quadratic(OptimizationFunction):
 
         :param Q: ([n x n] real symmetric matrix, not necessarily positive semidefinite):
                            the Hessian (i.e., the quadratic part) of f. If it is not
-                           positive semidefinite, f(x) will be unbounded below.
+                           positive semidefinite, f(x) will be unbounded below. It can
+                           also be a `LinearOperator`, e.g., a structured matrix which
+                           is never formed explicitly, so it is kept as it is.
         :param q: ([n x 1] real column vector): the linear part of f.
         """
-        Q = np.array(Q)
+        if not isinstance(Q, LinearOperator):
+            Q = np.array(Q)
         q = np.array(q)
 
-        n = len(Q)
+        n = Q.shape[0]
         super(Quadratic, self).__init__(n)
 
         if n <= 1:
             raise ValueError('Q is too small')
-        if n != Q.shape[0]:
+        if Q.ndim != 2 or n != Q.shape[1]:
             raise ValueError('Q is not square')
         self.Q = Q
 
@@ -254,6 +277,10 @@ class Quadratic(OptimizationFunction):
 
     def x_star(self):
         if not hasattr(self, 'x_opt'):
+            if isinstance(self.Q, LinearOperator):
+                # Q is not formed explicitly, so just rely on its products
+                self.x_opt = minres(self.Q, -self.q)[0]
+                return self.x_opt
             try:
                 # use the Cholesky factorization to solve the linear system if Q is
                 # symmetric and positive definite, i.e., the function is strictly convex
@@ -275,7 +302,7 @@ class Quadratic(OptimizationFunction):
         :return:  the value of a general quadratic function if x, the optimal solution of a
                   linear system Qx = q (=> x = Q^-1 q) which has a complexity of O(n^3) otherwise.
         """
-        return 0.5 * x @ self.Q @ x + self.q @ x
+        return 0.5 * x @ (self.Q @ x) + self.q @ x
 
     def jacobian(self, x):
         """
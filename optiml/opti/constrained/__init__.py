@@ -1,9 +1,10 @@
 __all__ = ['BoxConstrainedQuadraticOptimizer', 'LagrangianQuadratic', 'AugmentedLagrangianQuadratic',
-           'ProjectedGradient', 'ActiveSet', 'FrankWolfe', 'InteriorPoint']
+           'ProjectedGradient', 'SpectralProjectedGradient', 'ActiveSet', 'FrankWolfe', 'InteriorPoint']
 
 from ._base import BoxConstrainedQuadraticOptimizer, LagrangianQuadratic, AugmentedLagrangianQuadratic
 
 from .projected_gradient import ProjectedGradient
+from .spectral_projected_gradient import SpectralProjectedGradient
 from .active_set import ActiveSet
 from .frank_wolfe import FrankWolfe
 from .interior_point import InteriorPoint
@@ -2,9 +2,11 @@ from abc import ABC
 
 import autograd.numpy as np
 from autograd import hessian, jacobian
-from qpsolvers import solve_qp
 
 from optiml.opti import Optimizer, Quadratic
+from ..._lazy_import import lazy_import
+
+qpsolvers = lazy_import('qpsolvers')
 
 
 class BoxConstrainedQuadraticOptimizer(Optimizer, ABC):
@@ -21,32 +23,41 @@ class BoxConstrainedQuadraticOptimizer(Optimizer, ABC):
                  verbose=False):
         if not isinstance(quad, Quadratic):
             raise TypeError(f'{quad} is not an allowed quadratic function')
+        ub = np.asarray(ub, dtype=float)
+        if x is None:
+            # starts from the middle of the box or, along the directions
+            # without upper bound, i.e., ub = +inf, from 1
+            x = np.where(np.isinf(ub), 1., ub / 2)
+        else:
+            # warm start from the given point, e.g., a previous solution,
+            # made feasible wrt the (possibly different) box
+            x = np.clip(np.asarray(x, dtype=float), 0, ub)
         super(BoxConstrainedQuadraticOptimizer, self).__init__(f=quad,
-                                                               x=x or ub / 2,  # starts from the middle of the box
+                                                               x=x,
                                                                eps=eps,
                                                                tol=tol,
                                                                max_iter=max_iter,
                                                                callback=callback,
                                                                callback_args=callback_args,
                                                                verbose=verbose)
-        self.ub = np.asarray(ub, dtype=float)
+        self.ub = ub
 
     def f_star(self):
         return self.f.function(self.x_star())
 
     def x_star(self):
         if not hasattr(self, 'x_opt'):
-            self.x_opt = solve_qp(P=self.f.Q,
-                                  q=self.f.q,
-                                  lb=np.zeros_like(self.f.q),
-                                  ub=self.ub,
-                                  solver='quadprog')
+            self.x_opt = qpsolvers.solve_qp(P=np.array(self.f.Q),
+                                            q=self.f.q,
+                                            lb=np.zeros_like(self.f.q),
+                                            ub=self.ub,
+                                            solver='quadprog')
         return self.x_opt
 
 
-class LagrangianQuadratic(Quadratic):
+class ConstrainedQuadratic(Quadratic, ABC):
     """
-    Construct the lagrangian relaxation of a constrained quadratic function defined as:
+    Base class for the relaxations of a constrained quadratic function defined as:
 
             1/2 x^T Q x + q^T x : A x = b, G x <= h, lb <= x <= ub
 
@@ -55,33 +66,17 @@ class LagrangianQuadratic(Quadratic):
             1/2 x^T Q x + q^T x : A x = b, \hat{G} x <= \hat{h}
 
     where \hat{G}^T = [ G -I I ] and \hat{h} = [ h -lb ub ].
+
+    The identity blocks of the bound constraints are never built, i.e., they
+    are applied elementwise, so their memory and per-iteration cost is O(n)
+    rather than O(n^2).
     """
 
     def __init__(self, primal, A=None, b=None, G=None, h=None, lb=None, ub=None):
         if not isinstance(primal, Quadratic):
             raise TypeError(f'{primal} is not an allowed quadratic function')
-        super(LagrangianQuadratic, self).__init__(primal.Q, primal.q)
+        super(ConstrainedQuadratic, self).__init__(primal.Q, primal.q)
         self.primal = primal
-        self.A = np.atleast_2d(A).astype(float) if A is not None else None
-        self.b = b
-        self.G = np.atleast_2d(G).astype(float) if G is not None else None
-        self.h = h
-        self.lb = np.asarray(lb, dtype=float) if lb is not None else None
-        if self.lb is not None:
-            if self.G is None:
-                self.G = -np.eye(self.ndim)
-                self.h = -self.lb
-            else:
-                self.G = np.concatenate((self.G, -np.eye(self.ndim)), axis=0)
-                self.h = np.concatenate((self.h, -self.lb))
-        self.ub = np.asarray(ub, dtype=float) if ub is not None else None
-        if self.ub is not None:
-            if self.G is None:
-                self.G = np.eye(self.ndim)
-                self.h = self.ub
-            else:
-                self.G = np.concatenate((self.G, np.eye(self.ndim)), axis=0)
-                self.h = np.concatenate((self.h, self.ub))
         if G is None and h is not None:
             raise ValueError('incomplete inequality constraint (missing G)')
         if G is not None and h is None:
@@ -90,53 +85,117 @@ class LagrangianQuadratic(Quadratic):
             raise ValueError('incomplete equality constraint (missing A)')
         if A is not None and b is None:
             raise ValueError('incomplete equality constraint (missing b)')
-        # concatenate A with G and b with h for convenience and save the
-        # first idx of the Lagrange multipliers constrained to be >= 0
+        self.A = np.atleast_2d(A).astype(float) if A is not None else None
+        self.b = b
+        self.G = np.atleast_2d(G).astype(float) if G is not None else None
+        self.h = h
+        self.lb = np.asarray(lb, dtype=float) if lb is not None else None
+        self.ub = np.asarray(ub, dtype=float) if ub is not None else None
+        # the Lagrange multipliers are sorted as [mu, lmbda_G, lmbda_lb, lmbda_ub],
+        # so save the first idx of the ones constrained to be >= 0
         self.n_eq = self.A.shape[0] if self.A is not None else 0
-        if self.A is not None and self.G is not None:
-            self.AG = np.concatenate((self.A, self.G))
-        elif self.A is not None:
-            self.AG = self.A
-            self.G = np.zeros((self.ndim, self.ndim))  # G is None
-        elif self.G is not None:
-            self.AG = self.G
-            self.A = np.zeros((self.ndim, self.ndim))  # A is None
-        else:
-            self.A = np.zeros((self.ndim, self.ndim))
-            self.G = np.zeros((self.ndim, self.ndim))
-            self.AG = np.concatenate((self.A, self.G))  # A and G are None
-        if self.b is not None and self.h is not None:
-            self.bh = np.concatenate((self.b, self.h))
-        elif self.b is not None:
-            self.h = np.zeros(self.ndim)  # h is None
-            self.bh = self.b
-        elif self.h is not None:
-            self.b = np.zeros(self.ndim)  # b is None
-            self.bh = self.h
-        else:
-            self.b = np.zeros(self.ndim)
-            self.h = np.zeros(self.ndim)
-            self.bh = np.concatenate((self.b, self.h))  # b and h are None
-        self.ndim += self.AG.shape[0]
-        # backup Lagrange multipliers
-        self.dual_x = None  # mu_lmbda
+        self.n_constraints = (self.n_eq +
+                              (self.G.shape[0] if self.G is not None else 0) +
+                              (self.ndim if self.lb is not None else 0) +
+                              (self.ndim if self.ub is not None else 0))
 
     def f_star(self):
         return self.primal.function(self.x_star())
 
     def x_star(self):
         if not hasattr(self, 'x_opt'):
-            self.x_opt = solve_qp(P=self.Q,
-                                  q=self.q,
-                                  A=self.A if not np.all((self.A == 0)) else None,
-                                  b=self.b if not np.all((self.A == 0)) else None,  # check for A since b can be zero
-                                  G=self.G if not np.all((self.G == 0)) else None,
-                                  h=self.h if not np.all((self.G == 0)) else None,  # check for G since h can be zero
-                                  solver='cvxopt')
+            self.x_opt = qpsolvers.solve_qp(P=np.array(self.Q),
+                                            q=self.q,
+                                            A=self.A,
+                                            b=self.b,
+                                            G=self.G,
+                                            h=self.h,
+                                            lb=self.lb,
+                                            ub=self.ub,
+                                            solver='cvxopt')
         return self.x_opt
 
+    def _constraints(self, x):
+        """
+        Compute the value of the constraints \hat{A} x - \hat{b}, with \hat{A}^T = [ A G -I I ]
+        and \hat{b} = [ b h -lb ub ], where the bound constraints are evaluated elementwise.
+
+        :param x: the primal variable wrt evaluate the constraints
+        :return: the value of the constraints wrt primal variable
+        """
+        constraints = []
+        if self.A is not None:
+            constraints.append(self.A @ x - self.b)
+        if self.G is not None:
+            constraints.append(self.G @ x - self.h)
+        if self.lb is not None:
+            constraints.append(self.lb - x)
+        if self.ub is not None:
+            constraints.append(x - self.ub)
+        return np.concatenate(constraints)
+
+    def _constraints_rdot(self, mu_lmbda):
+        """
+        Compute the product mu_lmbda^T \hat{A}, with \hat{A}^T = [ A G -I I ], where the
+        bound constraints are applied elementwise.
+
+        :param mu_lmbda: the Lagrange multipliers, or any vector of the same size
+        :return: the product wrt the Lagrange multipliers
+        """
+        rdot = np.zeros(self.primal.ndim)
+        start = 0
+        if self.A is not None:
+            rdot += mu_lmbda[start:start + self.A.shape[0]] @ self.A
+            start += self.A.shape[0]
+        if self.G is not None:
+            rdot += mu_lmbda[start:start + self.G.shape[0]] @ self.G
+            start += self.G.shape[0]
+        if self.lb is not None:
+            rdot -= mu_lmbda[start:start + self.primal.ndim]
+            start += self.primal.ndim
+        if self.ub is not None:
+            rdot += mu_lmbda[start:start + self.primal.ndim]
+        return rdot
+
+    def _constraints_matrix(self):
+        """
+        Build the matrix \hat{A}^T = [ A G -I I ] of the constraints explicitly.
+
+        :return: the dense matrix of the constraints
+        """
+        blocks = []
+        if self.A is not None:
+            blocks.append(self.A)
+        if self.G is not None:
+            blocks.append(self.G)
+        if self.lb is not None:
+            blocks.append(-np.identity(self.primal.ndim))
+        if self.ub is not None:
+            blocks.append(np.identity(self.primal.ndim))
+        return np.vstack(blocks)
+
+
+class LagrangianQuadratic(ConstrainedQuadratic):
+    """
+    Construct the lagrangian relaxation of a constrained quadratic function defined as:
+
+            1/2 x^T Q x + q^T x : A x = b, G x <= h, lb <= x <= ub
+
+    i.e.,
+
+            1/2 x^T Q x + q^T x : A x = b, \hat{G} x <= \hat{h}
+
+    where \hat{G}^T = [ G -I I ] and \hat{h} = [ h -lb ub ].
+    """
+
+    def __init__(self, primal, A=None, b=None, G=None, h=None, lb=None, ub=None):
+        super(LagrangianQuadratic, self).__init__(primal=primal, A=A, b=b, G=G, h=h, lb=lb, ub=ub)
+        self.ndim += self.n_constraints
+        # backup Lagrange multipliers
+        self.dual_x = None  # mu_lmbda
+
     def constraints(self, x_mu_lmbda):
-        return self.AG @ x_mu_lmbda[:self.primal.ndim] - self.bh
+        return self._constraints(x_mu_lmbda[:self.primal.ndim])
 
     def function(self, x_mu_lmbda):
         """
@@ -148,7 +207,7 @@ class LagrangianQuadratic(Quadratic):
         :return: the function value wrt primal-dual variable
         """
         x, mu_lmbda = np.split(x_mu_lmbda, [self.primal.ndim])
-        return self.primal.function(x) + mu_lmbda @ (self.AG @ x - self.bh)
+        return self.primal.function(x) + mu_lmbda @ self._constraints(x)
 
     def jacobian(self, x_mu_lmbda):
         """
@@ -161,18 +220,29 @@ class LagrangianQuadratic(Quadratic):
         """
         # jac = self.auto_jac(x_mu_lmbda)  # slower
         x, mu_lmbda = np.split(x_mu_lmbda, [self.primal.ndim])
-        jac = np.concatenate((self.primal.jacobian(x) + mu_lmbda @ self.AG,  # gradient wrt x
-                              self.A @ x - self.b if not np.all((self.A == 0)) else [],  # gradient wrt mu
-                              self.G @ x - self.h if not np.all((self.G == 0)) else []))  # gradient wrt lmbda
         # gradient ascent for the dual since we need to maximize wrt mu_lmbda, so we change the sign
-        jac[self.primal.ndim:] = -jac[self.primal.ndim:]
-        return jac
+        return np.concatenate((self.primal.jacobian(x) + self._constraints_rdot(mu_lmbda),  # gradient wrt x
+                               -self._constraints(x)))  # gradient wrt mu_lmbda
 
-    def hessian(self, x):
-        return self.auto_hess(x)
+    def hessian(self, x_mu_lmbda):
+        """
+        Compute the hessian of the lagrangian relaxation defined as:
+
+            H L(x, mu, lambda) = [ Q  \hat{A}^T ]
+                                 [ \hat{A}   0  ]
+
+        where Q is formed explicitly, e.g., if it is a `LinearOperator`, since
+        autograd cannot trace its products.
+
+        :param x_mu_lmbda: the primal-dual variable wrt evaluate the hessian
+        :return: the hessian wrt primal-dual variable
+        """
+        A = self._constraints_matrix()
+        return np.block([[np.array(self.Q, dtype=float), A.T],
+                         [A, np.zeros((self.n_constraints, self.n_constraints))]])
 
 
-class AugmentedLagrangianQuadratic(Quadratic):
+class AugmentedLagrangianQuadratic(ConstrainedQuadratic):
     """
     Construct the augmented lagrangian relaxation of a constrained quadratic function defined as:
 
@@ -186,70 +256,12 @@ class AugmentedLagrangianQuadratic(Quadratic):
     """
 
     def __init__(self, primal, A=None, b=None, G=None, h=None, lb=None, ub=None, rho=1):
-        if not isinstance(primal, Quadratic):
-            raise TypeError(f'{primal} is not an allowed quadratic function')
-        super(AugmentedLagrangianQuadratic, self).__init__(primal.Q, primal.q)
-        self.primal = primal
-        self.A = np.atleast_2d(A).astype(float) if A is not None else None
-        self.b = b
-        self.G = np.atleast_2d(G).astype(float) if G is not None else None
-        self.h = h
-        self.lb = np.asarray(lb, dtype=float) if lb is not None else None
-        if self.lb is not None:
-            if self.G is None:
-                self.G = -np.eye(self.ndim)
-                self.h = -self.lb
-            else:
-                self.G = np.concatenate((self.G, -np.eye(self.ndim)), axis=0)
-                self.h = np.concatenate((self.h, -self.lb))
-        self.ub = np.asarray(ub, dtype=float) if ub is not None else None
-        if self.ub is not None:
-            if self.G is None:
-                self.G = np.eye(self.ndim)
-                self.h = self.ub
-            else:
-                self.G = np.concatenate((self.G, np.eye(self.ndim)), axis=0)
-                self.h = np.concatenate((self.h, self.ub))
-        if G is None and h is not None:
-            raise ValueError('incomplete inequality constraint (missing G)')
-        if G is not None and h is None:
-            raise ValueError('incomplete inequality constraint (missing h)')
-        if A is None and b is not None:
-            raise ValueError('incomplete equality constraint (missing A)')
-        if A is not None and b is None:
-            raise ValueError('incomplete equality constraint (missing b)')
+        super(AugmentedLagrangianQuadratic, self).__init__(primal=primal, A=A, b=b, G=G, h=h, lb=lb, ub=ub)
         if not rho > 0:
             raise ValueError('rho must be must > 0')
         self.rho = rho
-        # concatenate A with G and b with h for convenience and save the
-        # first idx of the Lagrange multipliers constrained to be >= 0
-        self.n_eq = self.A.shape[0] if self.A is not None else 0
-        if self.A is not None and self.G is not None:
-            self.AG = np.concatenate((self.A, self.G))
-        elif self.A is not None:
-            self.AG = self.A
-            self.G = np.zeros((self.ndim, self.ndim))  # G is None
-        elif self.G is not None:
-            self.AG = self.G
-            self.A = np.zeros((self.ndim, self.ndim))  # A is None
-        else:
-            self.A = np.zeros((self.ndim, self.ndim))
-            self.G = np.zeros((self.ndim, self.ndim))
-            self.AG = np.concatenate((self.A, self.G))  # A and G are None
-        if self.b is not None and self.h is not None:
-            self.bh = np.concatenate((self.b, self.h))
-        elif self.b is not None:
-            self.h = np.zeros(self.ndim)  # h is None
-            self.bh = self.b
-        elif self.h is not None:
-            self.b = np.zeros(self.ndim)  # b is None
-            self.bh = self.h
-        else:
-            self.b = np.zeros(self.ndim)
-            self.h = np.zeros(self.ndim)
-            self.bh = np.concatenate((self.b, self.h))  # b and h are None
         # initialize Lagrange multipliers to 0
-        self.dual_x = np.zeros(self.AG.shape[0])  # mu_lmbda
+        self.dual_x = np.zeros(self.n_constraints)  # mu_lmbda
         self.past_dual_x = self.dual_x.copy()
         # overwrite autograd utils
         self.auto_jac = jacobian(self._autograd_function)
@@ -259,25 +271,11 @@ class AugmentedLagrangianQuadratic(Quadratic):
         self.last_x = None
         self.last_constraints = None
 
-    def f_star(self):
-        return self.primal.function(self.x_star())
-
-    def x_star(self):
-        if not hasattr(self, 'x_opt'):
-            self.x_opt = solve_qp(P=self.Q,
-                                  q=self.q,
-                                  A=self.A if not np.all((self.A == 0)) else None,
-                                  b=self.b if not np.all((self.A == 0)) else None,  # check for A since b can be zero
-                                  G=self.G if not np.all((self.G == 0)) else None,
-                                  h=self.h if not np.all((self.G == 0)) else None,  # check for G since h can be zero
-                                  solver='cvxopt')
-        return self.x_opt
-
     def constraints(self, x):
         if np.array_equal(self.last_x, x):
             constraints = self.last_constraints.copy()  # speedup: just restore
         else:
-            constraints = self.AG @ x - self.bh
+            constraints = self._constraints(x)
             # backup {x: constraints}
             self.last_x = x.copy()
             self.last_constraints = constraints.copy()
@@ -305,15 +303,15 @@ class AugmentedLagrangianQuadratic(Quadratic):
         L(x, mu, lambda) = 1/2 x^T Q x + q^T x + mu^T (A x - b) + lambda^T (G x - h) + rho/2 ||(A x - b) + (G x - h)||^2
 
         Returns the same value of `function(self, x)` but it is written avoiding vector assignments
-        to make it understandable by autograd, so it perform more matrix-vector products and for this
-        reason it is more computationally expensive.
+        to make it understandable by autograd.
 
         :param x: the primal variable wrt evaluate the function
         :return: the function value wrt primal-dual variable
         """
-        return (self.primal.function(x) + self.dual_x @ (self.AG @ x - self.bh) +
-                0.5 * self.rho * np.sum(np.square(self.A @ x - self.b)) +
-                0.5 * self.rho * np.sum(np.square(np.clip(self.G @ x - self.h, a_min=0, a_max=None))))
+        constraints = self._constraints(x)
+        return (self.primal.function(x) + self.dual_x @ constraints +
+                0.5 * self.rho * np.sum(np.square(constraints[:self.n_eq])) +
+                0.5 * self.rho * np.sum(np.square(np.clip(constraints[self.n_eq:], a_min=0, a_max=None))))
 
     def jacobian(self, x):
         """
@@ -328,10 +326,9 @@ class AugmentedLagrangianQuadratic(Quadratic):
         constraints = self.constraints(x)
         clipped_constraints = constraints.copy()
         clipped_constraints[self.n_eq:] = np.clip(constraints[self.n_eq:], a_min=0, a_max=None)
-        idx_nonclipped = clipped_constraints != 0
-        return (self.primal.jacobian(x) + self.dual_x @ self.AG +
-                self.rho * self.AG[idx_nonclipped].T @ self.AG[idx_nonclipped] @ x -
-                self.rho * self.bh[idx_nonclipped] @ self.AG[idx_nonclipped])
+        # the penalty term only involves the constraints that are not clipped, i.e.,
+        # rho \hat{A}_I^T (\hat{A}_I x - \hat{b}_I) = rho \hat{A}^T clipped_constraints
+        return self.primal.jacobian(x) + self._constraints_rdot(self.dual_x + self.rho * clipped_constraints)
 
     def function_jacobian(self, x):
         constraints = self.constraints(x)
@@ -339,11 +336,39 @@ class AugmentedLagrangianQuadratic(Quadratic):
         clipped_constraints[self.n_eq:] = np.clip(constraints[self.n_eq:], a_min=0, a_max=None)
         fun = (self.primal.function(x) + self.dual_x @ constraints +
                0.5 * self.rho * np.linalg.norm(clipped_constraints) ** 2)
-        idx_nonclipped = clipped_constraints != 0
-        jac = (self.primal.jacobian(x) + self.dual_x @ self.AG +
-               self.rho * self.AG[idx_nonclipped].T @ self.AG[idx_nonclipped] @ x -
-               self.rho * self.bh[idx_nonclipped] @ self.AG[idx_nonclipped])
+        jac = self.primal.jacobian(x) + self._constraints_rdot(self.dual_x + self.rho * clipped_constraints)
         return fun, jac
 
     def hessian(self, x):
-        return self.auto_hess(x)
+        """
+        Compute the hessian of the augmented lagrangian relaxation defined as:
+
+            H L(x, mu, lambda) = Q + rho \hat{A}_I^T \hat{A}_I
+
+        where I are the equality constraints and the violated inequality ones,
+        the bound constraints just add rho to the diagonal, and Q is formed
+        explicitly, e.g., if it is a `LinearOperator`, since autograd cannot
+        trace its products.
+
+        :param x: the primal variable wrt evaluate the hessian
+        :return: the hessian wrt primal variable
+        """
+        # return self.auto_hess(x)  # slower
+        constraints = self.constraints(x)
+        H = np.array(self.Q, dtype=float)
+        start = 0
+        if self.A is not None:
+            H += self.rho * self.A.T @ self.A
+            start += self.A.shape[0]
+        if self.G is not None:
+            G = self.G[constraints[start:start + self.G.shape[0]] > 0]
+            H += self.rho * G.T @ G
+            start += self.G.shape[0]
+        diag = np.zeros(self.primal.ndim)
+        if self.lb is not None:
+            diag += constraints[start:start + self.primal.ndim] > 0
+            start += self.primal.ndim
+        if self.ub is not None:
+            diag += constraints[start:start + self.primal.ndim] > 0
+        H[np.diag_indices_from(H)] += self.rho * diag
+        return H
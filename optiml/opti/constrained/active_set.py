@@ -1,5 +1,6 @@
 import numpy as np
-from scipy.linalg import cho_solve, cho_factor
+from scipy.linalg import cholesky, solve_triangular
+from scipy.linalg.blas import drot
 from scipy.sparse.linalg import minres
 
 from optiml.opti.constrained import BoxConstrainedQuadraticOptimizer
@@ -32,6 +33,10 @@ class ActiveSet(BoxConstrainedQuadraticOptimizer):
     #   = 'stopped': the algorithm terminated having exhausted the maximum
     #     number of iterations: x is the bast solution found so far, but not
     #     necessarily the optimal one
+    #
+    # The Cholesky factorization of Q_{AA} is computed once and then updated
+    # by rank-one insertions and deletions as the variables enter or leave the
+    # active set, i.e., O(k^2) rather than O(k^3) per iteration with k = |A|.
 
     def __init__(self,
                  quad,
@@ -55,20 +60,29 @@ class ActiveSet(BoxConstrainedQuadraticOptimizer):
 
     def minimize(self):
 
-        self.f_x = self.f.function(self.x)
-
         # because all constraints are box ones, the active set is logically
         # partitioned onto the set of lower and upper bound constraints that are
         # active, L and U respectively. Of course, L and U have to be disjoint.
-        # Since we start from the middle of the box, both the initial active sets
-        # are empty
-        L = np.full(self.f.ndim, False)  # indexes of variables fixed to the lower bound
-        U = np.full(self.f.ndim, False)  # indexes of variables fixed to the upper bound
+        # If we start from the middle of the box, both the initial active sets
+        # are empty, otherwise, i.e., when warm started from a previous solution,
+        # they are guessed from the variables which lie at their bounds
+        L = self.x <= 1e-12  # indexes of variables fixed to the lower bound
+        U = np.logical_and(self.x >= self.ub - 1e-12, np.logical_not(L))  # indexes of variables fixed to the upper bound
+        self.x[L] = 0
+        self.x[U] = self.ub[U]
 
         # the set of "active variables", those that do *not* belong to any of the
         # two active sets and therefore are "free", is therefore the complement to
-        # 1 : n of L union U; since L and U are empty now, A = 1 : n
-        A = np.full(self.f.ndim, True)
+        # 1 : n of L union U, e.g., A = 1 : n if L and U are empty
+        A = np.logical_not(np.logical_or(L, U))
+
+        # the free variables, sorted as the rows and columns of the upper triangular
+        # Cholesky factor R of Q_{AA}, i.e., R^T R = Q_{AA}, which is None if Q_{AA}
+        # is not positive definite
+        F = list(np.flatnonzero(A))
+        R = self._cholesky(F)
+
+        self.f_x = self.f.function(self.x)
 
         if self.verbose:
             print('iter\t cost\t\t|B|', end='')
@@ -103,21 +117,28 @@ class ActiveSet(BoxConstrainedQuadraticOptimizer):
             xs = np.zeros_like(self.x)
             xs[U] = self.ub[U]
 
-            try:
-                # use the Cholesky factorization to solve the linear system if Q_{AA} is
-                # symmetric and positive definite, i.e., the function is strictly convex
-                xs[A] = cho_solve(cho_factor(self.f.Q[A, :][:, A]),
-                                  -(self.f.q[A] + self.f.Q[A, :][:, U].dot(self.ub[U])))
-            except:  # np.linalg.LinAlgError:
-                # since Q is is not strictly psd, i.e., the function is linear along the
-                # eigenvectors correspondent to the null eigenvalues, the system has infinite
-                # solutions, so we will choose the one that minimizes the 2-norm
-                Q = self.f.Q[A, :][:, A]
-                q = self.f.q[A] + self.f.Q[A, :][:, U].dot(self.ub[U])
-                # `min ||Qx - q||` is formally equivalent to solve the linear system:
-                #                       (Q^T Q) x = (Q^T q)^T x
-                Q, q = np.inner(Q, Q), Q.T.dot(q)
-                xs[A] = minres(Q, -q)[0]
+            if F:
+
+                q = self.f.q[F] + self.f.Q[np.ix_(F, U.nonzero()[0])].dot(self.ub[U])
+
+                if R is None:  # try to refactorize, since Q_{AA} may have become positive definite
+                    R = self._cholesky(F)
+
+                if R is not None:
+                    # use the Cholesky factorization to solve the linear system if Q_{AA} is
+                    # symmetric and positive definite, i.e., the function is strictly convex,
+                    # by two triangular solves with R^T and R, i.e., O(k^2)
+                    xs[F] = solve_triangular(R, solve_triangular(R, -q, trans='T', check_finite=False),
+                                             check_finite=False)
+                else:
+                    # since Q is is not strictly psd, i.e., the function is linear along the
+                    # eigenvectors correspondent to the null eigenvalues, the system has infinite
+                    # solutions, so we will choose the one that minimizes the 2-norm
+                    Q = self.f.Q[np.ix_(F, F)]
+                    # `min ||Qx - q||` is formally equivalent to solve the linear system:
+                    #                       (Q^T Q) x = (Q^T q)^T x
+                    Q, q = np.inner(Q, Q), Q.T.dot(q)
+                    xs[F] = minres(Q, -q)[0]
 
             if np.logical_and(xs[A] <= self.ub[A] + 1e-12, xs[A] >= -1e-12).all():
                 # the solution of the unconstrained problem is actually feasible
@@ -148,6 +169,9 @@ class ActiveSet(BoxConstrainedQuadraticOptimizer):
                 else:
                     h = h[0]  # that's probably Bland's anti-cycle rule
                     A[h] = True
+                    if R is not None:
+                        R = self._cholesky_insert(R, F, h)
+                    F.append(h)
                     if uppr:
                         U[h] = False
                         if self.is_verbose():
@@ -188,6 +212,13 @@ class ActiveSet(BoxConstrainedQuadraticOptimizer):
                 U[nU] = True
                 A[nU] = False
 
+                # remove the leaving variables from the factorization, starting from
+                # the last ones so that the positions of the others are unchanged
+                for i in sorted((F.index(h) for h in np.flatnonzero(np.logical_or(nL, nU))), reverse=True):
+                    if R is not None:
+                        R = self._cholesky_delete(R, i)
+                    del F[i]
+
                 if self.is_verbose():
                     print('\tI/O: I {:d}+{:d}'.format(sum(nL), sum(nU)), end='')
 
@@ -204,3 +235,40 @@ class ActiveSet(BoxConstrainedQuadraticOptimizer):
             print('\n')
 
         return self
+
+    def _cholesky(self, F):
+        try:
+            return cholesky(self.f.Q[np.ix_(F, F)])
+        except np.linalg.LinAlgError:
+            return None
+
+    def _cholesky_insert(self, R, F, h):
+        """
+        Update the upper triangular Cholesky factor R of Q_{FF} to the one of
+        Q_{F'F'} with F' = F + [h], i.e., append a column and a row to R in O(k^2).
+        """
+        r = solve_triangular(R, self.f.Q[F, h], trans='T', check_finite=False) if F else np.zeros(0)
+        rho = self.f.Q[h, h] - r.dot(r)
+        if rho <= 0:  # Q_{F'F'} is not positive definite
+            return None
+        k = len(F)
+        R_new = np.zeros((k + 1, k + 1))
+        R_new[:k, :k] = R
+        R_new[:k, k] = r
+        R_new[k, k] = np.sqrt(rho)
+        return R_new
+
+    @staticmethod
+    def _cholesky_delete(R, i):
+        """
+        Update the upper triangular Cholesky factor R of Q_{FF} to the one of
+        Q_{F'F'} with F' = F \\ F[i], i.e., remove the i-th column from R and
+        restore the triangular form of the resulting upper Hessenberg matrix by
+        Givens rotations in O(k^2).
+        """
+        R = np.ascontiguousarray(np.delete(R, i, axis=1))  # row-major, so the rotations are in place
+        for j in range(i, R.shape[1]):
+            a, b = R[j, j], R[j + 1, j]
+            r = np.hypot(a, b)
+            R[j, j:], R[j + 1, j:] = drot(R[j, j:], R[j + 1, j:], a / r, b / r, overwrite_x=True, overwrite_y=True)
+        return R[:-1]
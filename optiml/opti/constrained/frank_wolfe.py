@@ -63,6 +63,9 @@ class FrankWolfe(BoxConstrainedQuadraticOptimizer):
                                          callback=callback,
                                          callback_args=callback_args,
                                          verbose=verbose)
+        if np.isinf(self.ub).any():
+            # the linear minimization over the (unbounded) feasible set is unbounded below
+            raise ValueError('FrankWolfe requires a bounded box, i.e., ub < +inf')
         if not 0 <= t < 1:
             raise ValueError('t has to lie in [0, 1)')
         self.t = t
@@ -122,7 +125,7 @@ class FrankWolfe(BoxConstrainedQuadraticOptimizer):
             #
             # ==> a = -d^T * (Q * x + q) / d^T * Q * d
             #
-            den = d.dot(self.f.Q).dot(d)
+            den = d.dot(self.f.Q.dot(d))
 
             if den <= 1e-16:  # d^T * Q * d = 0  ==>  f is linear along d
                 a = 1  # just take the maximum possible step size
@@ -56,6 +56,11 @@ class InteriorPoint(BoxConstrainedQuadraticOptimizer):
                                             callback=callback,
                                             callback_args=callback_args,
                                             verbose=verbose)
+        if x is not None:
+            # the iterates must be strictly interior, so move the warm start point,
+            # e.g., a previous solution with some variables at their bounds, a bit
+            # towards the starting point by default, i.e., the middle of the box
+            self.x = 0.99 * self.x + 0.01 * np.where(np.isinf(self.ub), 1., self.ub / 2)
 
     def minimize(self):
 
@@ -139,8 +144,19 @@ class InteriorPoint(BoxConstrainedQuadraticOptimizer):
         # by taking lm = [Q x + q]_+ and lp = [-Q x - q]_+. However, by doing
         # so lm and lp would not be interior. The obvious solution is to add to
         # both a term eps * e with some small eps (1e-6)
+        #
+        # Along the directions without upper bound, i.e., u_i = +inf, there is
+        # no \lambda^+_i, i.e., lp_i = 0, so the dual solution is not feasible
+        # if [Q x + q]_i < 0: the residual r = Q x + q + lp - lm of (1) is then
+        # added to the right-hand side of the linearized system, i.e.:
+        #
+        #   Q dx + dlp - dlm = -r                               (1)
+        #
+        # so that the iterates become feasible as the step size approaches 1
+
+        bnd = np.isfinite(self.ub)  # directions with upper bound
 
-        # compute a feasible interior dual solution satisfying SKKTS with x for some
+        # compute an interior dual solution satisfying SKKTS with x for some
         # \mu we don't care much of
         self.g_x = self.f.jacobian(self.x)
         lp = 1e-6 * np.ones(self.f.ndim)
@@ -149,15 +165,17 @@ class InteriorPoint(BoxConstrainedQuadraticOptimizer):
         lm[idx] = lm[idx] + self.g_x[idx]
         idx = np.logical_not(idx)
         lp[idx] = lp[idx] - self.g_x[idx]
+        lp[~bnd] = 0
 
         if self.verbose:
             print('iter\t cost\t\t p\t\t gap', end='')
 
         while True:
-            self.f_x = self.f.function(self.x)
-            xQx = self.x.dot(self.f.Q).dot(self.x)
-            p = -lp.dot(self.ub) - 0.5 * xQx
+            self.f_x, self.g_x = self.f.function(self.x), self.f.jacobian(self.x)
+            xQx = self.x.dot(self.f.Q.dot(self.x))
+            p = -lp[bnd].dot(self.ub[bnd]) - 0.5 * xQx
             gap = (self.f_x - p) / max(abs(self.f_x), 1)
+            r = self.g_x + lp - lm  # dual residual, i.e., 0 if all u_i < +inf
 
             if self.is_verbose():
                 print('\n{:4d}\t{: 1.4e}\t{: 1.4e}\t{: 1.4e}'.format(self.iter, self.f_x, p, gap), end='')
@@ -168,7 +186,7 @@ class InteriorPoint(BoxConstrainedQuadraticOptimizer):
                 break
 
             # stopping criteria
-            if gap <= self.eps:
+            if gap <= self.eps and np.linalg.norm(r) <= np.sqrt(self.eps) * max(np.linalg.norm(self.f.q), 1):
                 self.status = 'optimal'
                 break
 
@@ -187,12 +205,18 @@ class InteriorPoint(BoxConstrainedQuadraticOptimizer):
             #
             # it appears this last form is *vastly* more numerically stable
 
-            mu = (self.f_x - p) / (4 * self.f.ndim * self.f.ndim)  # use \rho = 1 / (# of constraints)
-
             umx = self.ub - self.x
-            H = self.f.Q + np.diag(lp / umx + lm / self.x)
-            # w = \mu (np.ones(n) / umx - np.ones(n) / self.x) + lp - lm
-            w = mu * (self.ub - 2 * self.x) / (umx * self.x) + lp - lm
+
+            # the complementarity lp (u - x) + lm x, i.e., f(x) - p if r = 0
+            mu = ((lp[bnd].dot(umx[bnd]) + lm.dot(self.x)) /
+                  (4 * self.f.ndim * self.f.ndim))  # use \rho = 1 / (# of constraints)
+
+            H = np.array(self.f.Q, dtype=float)
+            H[np.diag_indices_from(H)] += lp / umx + lm / self.x
+            # w = \mu (np.ones(n) / self.x - np.ones(n) / umx) + lp - lm - r
+            w = lp - lm - r
+            w[bnd] += mu * (self.ub[bnd] - 2 * self.x[bnd]) / (umx[bnd] * self.x[bnd])
+            w[~bnd] += mu / self.x[~bnd]  # since 1 / umx = 0
 
             # and use Cholesky to solve the system since
             # H is a symmetric positive definite matrix
@@ -100,7 +100,7 @@ class ProjectedGradient(BoxConstrainedQuadraticOptimizer):
             # min { 1/2 a^2 (d^T Q d) + a d^T (Q x + q) } [ + const ]
             #
             # => a = - d^T (Q x + q) / d^T Q d
-            den = d.dot(self.f.Q).dot(d)
+            den = d.dot(self.f.Q.dot(d))
 
             if den <= 1e-16:  # d^T Q d = 0 ==> f is linear along d
                 t = max_t  # just take the maximum possible step size
@@ -0,0 +1,209 @@
+import numpy as np
+
+from optiml.opti.constrained import BoxConstrainedQuadraticOptimizer
+from ..._lazy_import import lazy_import
+
+qpsolvers = lazy_import('qpsolvers')
+
+
+class SpectralProjectedGradient(BoxConstrainedQuadraticOptimizer):
+    # Apply the Spectral Projected Gradient algorithm, i.e., the projected
+    # gradient with the Barzilai-Borwein step size, with exact line search to
+    # the convex Box-Constrained Quadratic program with (at most) a single
+    # linear equality constraint, e.g., the dual of the SVM with the bias:
+    #
+    #  (P) min { 1/2 x^T Q x + q^T x : A x = b, 0 <= x <= ub }
+    #
+    # The projection onto the feasible set is computed exactly in O(n log n)
+    # by searching the multiplier of the equality constraint over the sorted
+    # breakpoints of the piecewise linear function A clip(z - lmbda A, 0, ub).
+    #
+    # - A ([n x 1] real column vector, optional, default value None): the
+    #   coefficients of the linear equality constraint. If None, only the box
+    #   constraints are considered
+    #
+    # - b (real scalar, optional, default value 0): the right-hand side of the
+    #   linear equality constraint
+    #
+    # - eps (real scalar, optional, default value 1e-6): the accuracy in the
+    #   stopping criterion: the algorithm is stopped when the norm of the
+    #   projected gradient is less than or equal to eps
+    #
+    # - max_iter (integer scalar, optional, default value 1000): the maximum
+    #   number of iterations
+    #
+    # Output:
+    #
+    # - v (real scalar): the best function value found so far (possibly the
+    #   optimal one)
+    #
+    # - x ([n x 1] real column vector, optional): the best solution found so
+    #   far (possibly the optimal one)
+    #
+    # - status (string, optional): a string describing the status of the
+    #   algorithm at termination, with the following possible values:
+    #
+    #   = 'optimal': the algorithm terminated having proven that x is an
+    #     (approximately) optimal solution, i.e., the norm of the projected
+    #     gradient at x is less than the required threshold
+    #
+    #   = 'stopped': the algorithm terminated having exhausted the maximum
+    #     number of iterations: x is the bast solution found so far, but not
+    #     necessarily the optimal one
+
+    def __init__(self,
+                 quad,
+                 ub,
+                 A=None,
+                 b=0.,
+                 x=None,
+                 eps=1e-6,
+                 tol=1e-8,
+                 max_iter=1000,
+                 callback=None,
+                 callback_args=(),
+                 verbose=False):
+        super(SpectralProjectedGradient, self).__init__(quad=quad,
+                                                        ub=ub,
+                                                        x=x,
+                                                        eps=eps,
+                                                        tol=tol,
+                                                        max_iter=max_iter,
+                                                        callback=callback,
+                                                        callback_args=callback_args,
+                                                        verbose=verbose)
+        if A is not None:
+            self.A = np.asarray(A, dtype=float).ravel()
+            if self.A.size != self.f.ndim:
+                raise ValueError('A must have the same size of x')
+            if not self.A.any():
+                raise ValueError('A must have at least one nonzero entry')
+            self.b = float(b)
+            # the range of A x over the box, where ub may be +inf
+            A_ub = self.A[self.A != 0] * self.ub[self.A != 0]
+            if not np.sum(A_ub[A_ub < 0]) <= self.b <= np.sum(A_ub[A_ub > 0]):
+                raise ValueError('the equality constraint is infeasible within the box')
+        else:
+            self.A = None
+            self.b = None
+        # starts from the projection of the initial point onto the feasible set
+        self.x = self.project(np.asarray(self.x, dtype=float))
+
+    def x_star(self):
+        if not hasattr(self, 'x_opt'):
+            self.x_opt = qpsolvers.solve_qp(P=np.array(self.f.Q),
+                                            q=self.f.q,
+                                            A=self.A,
+                                            b=np.full(1, self.b) if self.A is not None else None,
+                                            lb=np.zeros_like(self.f.q),
+                                            ub=self.ub,
+                                            solver='quadprog')
+        return self.x_opt
+
+    def project(self, z):
+        """
+        Compute the euclidean projection of z onto the feasible set, i.e.,
+        clip(z - lmbda A, 0, ub) where lmbda is the root of the nonincreasing
+        piecewise linear function r(lmbda) = A clip(z - lmbda A, 0, ub) - b.
+        """
+        if self.A is None:
+            return np.clip(z, 0, self.ub)
+
+        def x(lmbda):
+            return np.clip(z - lmbda * self.A, 0, self.ub)
+
+        def r(lmbda):
+            return self.A.dot(x(lmbda)) - self.b
+
+        def slope(lmbda):
+            # the slope of r around lmbda, i.e., -||A_F||^2 where F are the free variables
+            free = np.logical_and(x(lmbda) > 0, x(lmbda) < self.ub)
+            return -self.A[free].dot(self.A[free])
+
+        # r is linear between two consecutive breakpoints, i.e., the values of
+        # lmbda at which a variable enters or leaves one of its bounds
+        nz = self.A != 0
+        breakpoints = np.concatenate((z[nz] / self.A[nz],
+                                      (z[nz] - self.ub[nz]) / self.A[nz]))
+        breakpoints = np.unique(breakpoints[np.isfinite(breakpoints)])
+        lo, hi = 0, len(breakpoints) - 1
+        r_lo, r_hi = r(breakpoints[lo]), r(breakpoints[hi])
+        # r is linear on the left of the first breakpoint and on the right of the
+        # last one, and it is even constant if there is no variable with ub = +inf
+        if r_lo <= 0:
+            s = slope(breakpoints[lo] - 1)
+            return x(breakpoints[lo] - (r_lo / s if s < 0 else 0))
+        if r_hi >= 0:
+            s = slope(breakpoints[hi] + 1)
+            return x(breakpoints[hi] - (r_hi / s if s < 0 else 0))
+        # bisection over the sorted breakpoints, i.e., O(log n) evaluations of r
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            r_mid = r(breakpoints[mid])
+            if r_mid > 0:
+                lo, r_lo = mid, r_mid
+            else:
+                hi, r_hi = mid, r_mid
+        # the root lies within the bracketing breakpoints, where r is linear
+        return x(breakpoints[lo] + r_lo * (breakpoints[hi] - breakpoints[lo]) / (r_lo - r_hi))
+
+    def minimize(self):
+
+        if self.verbose:
+            print('iter\t cost\t\t pgnorm', end='')
+
+        a = 1.  # Barzilai-Borwein step size
+
+        while True:
+            self.f_x, self.g_x = self.f.function(self.x), self.f.jacobian(self.x)
+
+            # compute the norm of the projected gradient
+            pg = self.project(self.x - self.g_x) - self.x
+            npg = np.linalg.norm(pg)
+
+            if self.is_verbose():
+                print('\n{:4d}\t{: 1.4e}\t{: 1.4e}'.format(self.iter, self.f_x, npg), end='')
+
+            try:
+                self.callback()
+            except StopIteration:
+                break
+
+            if npg <= self.eps:
+                self.status = 'optimal'
+                break
+
+            if self.iter >= self.max_iter:
+                self.status = 'stopped'
+                break
+
+            # the feasible direction towards the projection of the
+            # gradient step, so x + t d is feasible for all 0 <= t <= 1
+            d = self.project(self.x - a * self.g_x) - self.x
+
+            # compute optimal unbounded step size:
+            #   min { 1/2 (x + t d)^T Q (x + t d) + q^T (x + t d) }
+            # min { 1/2 t^2 (d^T Q d) + t d^T (Q x + q) } [ + const ]
+            #
+            # => t = - d^T (Q x + q) / d^T Q d
+            den = d.dot(self.f.Q.dot(d))
+
+            if den <= 1e-16:  # d^T Q d = 0 ==> f is linear along d
+                t = 1.  # just take the maximum possible step size
+                a = 1e10
+            else:
+                # optimal unbounded step size restricted to max feasible step, and
+                # to be nonnegative since, because of rounding errors, d may not be
+                # a descent direction when close to the optimum
+                t = min(max(-self.g_x.dot(d) / den, 0.), 1.)
+                # Barzilai-Borwein step size s^T s / s^T Q s with s = t d
+                a = min(max(d.dot(d) / den, 1e-10), 1e10)
+
+            self.x += t * d
+
+            self.iter += 1
+
+        if self.verbose:
+            print('\n')
+
+        return self
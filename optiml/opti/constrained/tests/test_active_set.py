@@ -12,5 +12,18 @@ def test_ActiveSet():
     assert np.allclose(bcqp.minimize().x, bcqp.x_star())
 
 
+def test_ActiveSet_without_upper_bounds():
+    Q, q, _ = generate_box_constrained_quadratic(ndim=10)
+    bcqp = ActiveSet(quad=Quadratic(Q, q), ub=np.full(10, np.inf))
+    assert np.allclose(bcqp.minimize().x, bcqp.x_star(), atol=1e-4)
+
+
+def test_ActiveSet_with_cholesky_updates():
+    Q, q, ub = generate_box_constrained_quadratic(ndim=50)
+    bcqp = ActiveSet(quad=Quadratic(Q, q), ub=ub).minimize()
+    assert bcqp.iter > 1  # some variables have entered and left the active set
+    assert np.allclose(bcqp.x, bcqp.x_star())
+
+
 if __name__ == "__main__":
     pytest.main()
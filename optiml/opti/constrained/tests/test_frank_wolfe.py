@@ -12,5 +12,11 @@ def test_FrankWolfe():
     assert np.allclose(bcqp.minimize().x, bcqp.x_star())
 
 
+def test_FrankWolfe_without_upper_bounds():
+    Q, q, _ = generate_box_constrained_quadratic(ndim=2)
+    with pytest.raises(ValueError):
+        FrankWolfe(quad=Quadratic(Q, q), ub=np.full(2, np.inf))
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -12,5 +12,11 @@ def test_InteriorPoint():
     assert np.allclose(bcqp.minimize().x, bcqp.x_star())
 
 
+def test_InteriorPoint_without_upper_bounds():
+    Q, q, _ = generate_box_constrained_quadratic(ndim=10)
+    bcqp = InteriorPoint(quad=Quadratic(Q, q), ub=np.full(10, np.inf))
+    assert np.allclose(bcqp.minimize().x, bcqp.x_star(), atol=1e-4)
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -22,5 +22,27 @@ def test_AugmentedLagrangianQuadratic():
     assert np.allclose(AdaGrad(ld, step_size=1, epochs=15000).minimize().x, ld.x_star())
 
 
+def test_AugmentedLagrangianQuadratic_jacobian_with_implicit_bounds():
+    Q, q, ub = generate_box_constrained_quadratic(ndim=5)
+    A, b, lb = np.arange(1., 6.), np.zeros(1), np.zeros_like(q)
+    G, h = np.ones((1, 5)), np.ones(1)
+    ld = AugmentedLagrangianQuadratic(primal=Quadratic(Q, q), A=A, b=b, G=G, h=h, lb=lb, ub=ub, rho=2)
+    assert ld.n_constraints == 1 + 1 + 5 + 5
+    ld.dual_x = np.random.RandomState(123456).uniform(size=ld.n_constraints)
+    x = np.random.RandomState(123456).normal(scale=10, size=5)
+    assert np.allclose(ld.function(x), ld._autograd_function(x))
+    assert np.allclose(ld.jacobian(x), ld.auto_jac(x))
+    assert np.allclose(ld.hessian(x), ld.auto_hess(x))
+
+
+def test_LagrangianQuadratic_hessian():
+    Q, q, ub = generate_box_constrained_quadratic(ndim=5)
+    A, b, lb = np.arange(1., 6.), np.zeros(1), np.zeros_like(q)
+    G, h = np.ones((1, 5)), np.ones(1)
+    ld = LagrangianQuadratic(primal=Quadratic(Q, q), A=A, b=b, G=G, h=h, lb=lb, ub=ub)
+    x_mu_lmbda = np.random.RandomState(123456).normal(scale=10, size=ld.ndim)
+    assert np.allclose(ld.hessian(x_mu_lmbda), ld.auto_hess(x_mu_lmbda))
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from optiml.opti import Quadratic
+from optiml.opti.constrained import SpectralProjectedGradient
+from optiml.opti.utils import generate_box_constrained_quadratic
+
+
+def test_SpectralProjectedGradient():
+    Q, q, ub = generate_box_constrained_quadratic(ndim=2)
+    bcqp = SpectralProjectedGradient(quad=Quadratic(Q, q), ub=ub)
+    assert np.allclose(bcqp.minimize().x, bcqp.x_star())
+
+
+def test_SpectralProjectedGradient_with_equality_constraint():
+    Q, q, ub = generate_box_constrained_quadratic(ndim=10)
+    A = np.where(np.arange(10) % 2, 1., -1.)
+    bcqp = SpectralProjectedGradient(quad=Quadratic(Q, q), ub=ub, A=A, b=0.).minimize()
+    assert np.isclose(A.dot(bcqp.x), 0.)
+    assert np.all(bcqp.x >= 0) and np.all(bcqp.x <= ub)
+    assert np.allclose(bcqp.x, bcqp.x_star(), atol=1e-5)
+
+
+if __name__ == "__main__":
+    pytest.main()
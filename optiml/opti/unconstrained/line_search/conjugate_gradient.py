@@ -167,7 +167,7 @@ class ConjugateGradient(LineSearchOptimizer):
 
         self._print_header()
 
-        self.f_x, self.g_x = self.f.function(self.x), self.f.jacobian(self.x)
+        self.f_x, self.g_x = self.f.function_jacobian(self.x)
         self.ng = np.linalg.norm(self.g_x)
 
         if self.eps < 0:
@@ -207,7 +207,7 @@ class ConjugateGradient(LineSearchOptimizer):
                         print('\t(res)\t\t', end='')
                 else:
                     if isinstance(self.f, Quadratic) and not self.is_lagrangian_dual():
-                        beta = self.g_x.dot(self.f.Q).dot(past_d) / past_d.dot(self.f.Q).dot(past_d)
+                        beta = self.g_x.dot(self.f.Q.dot(past_d)) / past_d.dot(self.f.Q.dot(past_d))
                     else:
                         if self.wf == 'fr':  # Fletcher-Reeves
                             beta = (self.ng / np.linalg.norm(past_g_x)) ** 2
@@ -228,7 +228,7 @@ class ConjugateGradient(LineSearchOptimizer):
 
             if isinstance(self.f, Quadratic) and not self.is_lagrangian_dual():
 
-                den = d.dot(self.f.Q).dot(d)
+                den = d.dot(self.f.Q.dot(d))
 
                 if den <= 1e-12:
                     # this is actually two different cases:
@@ -249,7 +249,7 @@ class ConjugateGradient(LineSearchOptimizer):
 
                 # update new point
                 self.x += a * d
-                self.f_x, self.g_x = self.f.function(self.x), self.f.jacobian(self.x)
+                self.f_x, self.g_x = self.f.function_jacobian(self.x)
 
             else:
 
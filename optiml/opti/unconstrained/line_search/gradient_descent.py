@@ -170,7 +170,7 @@ class SteepestGradientDescent(LineSearchOptimizer):
 
         self._print_header()
 
-        self.f_x, self.g_x = self.f.function(self.x), self.f.jacobian(self.x)
+        self.f_x, self.g_x = self.f.function_jacobian(self.x)
         self.ng = np.linalg.norm(self.g_x)
 
         if self.eps < 0:
@@ -199,7 +199,7 @@ class SteepestGradientDescent(LineSearchOptimizer):
 
             if isinstance(self.f, Quadratic) and not self.is_lagrangian_dual():
 
-                den = self.g_x.dot(self.f.Q).dot(self.g_x)
+                den = self.g_x.dot(self.f.Q.dot(self.g_x))
 
                 if den <= 1e-12:
                     # this is actually two different cases:
@@ -223,7 +223,7 @@ class SteepestGradientDescent(LineSearchOptimizer):
 
                 # update new point
                 self.x += a * d
-                self.f_x, self.g_x = self.f.function(self.x), self.f.jacobian(self.x)
+                self.f_x, self.g_x = self.f.function_jacobian(self.x)
 
             else:
 
@@ -48,7 +48,7 @@ class LineSearch:
     def _f2phi(self, f, d, x, a, f_eval):
         # phi(a) = f(x + a * d)
         last_x = x + a * d
-        phi_a, last_g_x = f.function(last_x), f.jacobian(last_x)
+        phi_a, last_g_x = f.function_jacobian(last_x)
         f_eval += 1
         return phi_a, last_x, last_g_x, f_eval
 
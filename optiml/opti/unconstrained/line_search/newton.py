@@ -150,7 +150,7 @@ class Newton(LineSearchOptimizer):
 
         self._print_header()
 
-        self.f_x, self.g_x = self.f.function(self.x), self.f.jacobian(self.x)
+        self.f_x, self.g_x = self.f.function_jacobian(self.x)
         self.H_x = self.f.hessian(self.x)
         self.ng = np.linalg.norm(self.g_x)
 
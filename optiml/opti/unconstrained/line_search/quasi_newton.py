@@ -154,7 +154,7 @@ class BFGS(LineSearchOptimizer):
 
         self._print_header()
 
-        self.f_x, self.g_x = self.f.function(self.x), self.f.jacobian(self.x)
+        self.f_x, self.g_x = self.f.function_jacobian(self.x)
         self.ng = np.linalg.norm(self.g_x)
 
         if self.eps < 0:
@@ -1,7 +1,9 @@
 import numpy as np
-from cvxpy import Variable, Problem, Minimize, sum_squares
 
 from .. import Optimizer
+from ..._lazy_import import lazy_import
+
+cvxpy = lazy_import('cvxpy')
 
 
 class ProximalBundle(Optimizer):
@@ -119,7 +121,7 @@ class ProximalBundle(Optimizer):
                 print('\t\t gap', end='')
 
         # compute first function and subgradient
-        self.f_x, self.g_x = self.f.function(self.x), self.f.jacobian(self.x)
+        self.f_x, self.g_x = self.f.function_jacobian(self.x)
 
         ng = np.linalg.norm(self.g_x)
         if self.eps < 0:
@@ -134,8 +136,8 @@ class ProximalBundle(Optimizer):
         while True:
 
             # construct the master problem
-            d = Variable(self.x.size)
-            v = Variable(1)
+            d = cvxpy.Variable(self.x.size)
+            v = cvxpy.Variable(1)
 
             # each (fxi , gi , xi) gives the constraint:
             #
@@ -149,14 +151,14 @@ class ProximalBundle(Optimizer):
                 M += [v >= self.f.f_star()]
 
             # objective function
-            c = v + self.mu * sum_squares(d) / 2
+            c = v + self.mu * cvxpy.sum_squares(d) / 2
 
             if self.is_verbose() and self.master_verbose:
                 print('\n')
 
             # solve the master problem
-            Problem(Minimize(c), M).solve(solver=self.master_solver.upper(),
-                                          verbose=self.is_verbose() and self.master_verbose)
+            cvxpy.Problem(cvxpy.Minimize(c), M).solve(solver=self.master_solver.upper(),
+                                                      verbose=self.is_verbose() and self.master_verbose)
 
             try:
                 d = -d.value.ravel()
@@ -187,7 +189,7 @@ class ProximalBundle(Optimizer):
             last_x = self.x - d
 
             # compute function and subgradient
-            fd, self.g_x = self.f.function(last_x), self.f.jacobian(last_x)
+            fd, self.g_x = self.f.function_jacobian(last_x)
 
             try:
                 self.callback()
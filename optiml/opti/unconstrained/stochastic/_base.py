@@ -62,14 +62,14 @@ class StochasticOptimizer(Optimizer, ABC):
             self.batch_size = None
             self.batches = itertools.repeat(f.args())
         else:
-            n_samples = len(f.args()[0])
+            n_samples = f.args()[0].shape[0]
 
             if batch_size < 1 or batch_size > n_samples:
                 warnings.warn('Got `batch_size` less than 1 or larger than '
                               'sample size. It is going to be clipped.')
             self.batch_size = np.clip(batch_size, 1, n_samples)
 
-            self.n_batches, rest = divmod(len(f.args()[0]), self.batch_size)
+            self.n_batches, rest = divmod(n_samples, self.batch_size)
             if rest:
                 self.n_batches += 1
 
@@ -89,18 +89,22 @@ class StochasticOptimizer(Optimizer, ABC):
         :return: infinite iterator of mini batches in random order (without replacement)
         """
 
+        # the batch layout is fixed, so slice the mini batches once and yield
+        # the same objects at each epoch, i.e., views for dense arrays, which
+        # lets the function cache anything that only depends on the batch
+        batches = [[param[slice(i * self.batch_size, (i + 1) * self.batch_size)] for param in self.f.args()]
+                   for i in range(self.n_batches)]
+
         while True:
             idx = list(range(self.n_batches))
             while True:
                 if self.shuffle:
                     shuffle(idx, random_state=self.random_state)
                 for i in idx:
-                    start = i * self.batch_size
-                    stop = (i + 1) * self.batch_size
-                    yield [param[slice(start, stop)] for param in self.f.args()]
+                    yield batches[i]
 
     def is_batch_end(self):
-        return (self.batch_size is None or self.batch_size == len(self.f.args()[0])
+        return (self.batch_size is None or self.batch_size == self.f.args()[0].shape[0]
                 or (self.iter and not self.iter % self.n_batches))
 
     def is_verbose(self):